@@ -8,4 +8,89 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+asyncpg://postgres:postgres
 SECRET_KEY = os.getenv("SECRET_KEY", "63f4945d921d599f27ae4fdf5bada3f1")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
\ No newline at end of file
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", 50))
+TASKS_PAGE_SIZE_MAX = int(os.getenv("TASKS_PAGE_SIZE_MAX", 200))
+
+# "auto" picks the Postgres full-text backend on PostgreSQL and the in-process index elsewhere
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_TS_CONFIG = os.getenv("SEARCH_TS_CONFIG", "simple")
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+
+# Worker processes started by app.server; every worker derives its share of pools and threads from it
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# "thread" is enough because bcrypt releases the GIL; "process" isolates hashing completely
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 64))
+
+TASKS_BATCH_MAX = int(os.getenv("TASKS_BATCH_MAX", 500))
+# Group commit for POST /tasks: creates arriving within the window (or until the row cap) share one INSERT and commit
+TASK_WRITE_COALESCING = os.getenv("TASK_WRITE_COALESCING", "false").lower() in ("1", "true", "yes")
+TASK_WRITE_COALESCE_MS = float(os.getenv("TASK_WRITE_COALESCE_MS", 3))
+TASK_WRITE_COALESCE_MAX = int(os.getenv("TASK_WRITE_COALESCE_MAX", 100))
+# Export/import work in chunks of this many rows so memory does not grow with the file
+TASKS_EXPORT_CHUNK = int(os.getenv("TASKS_EXPORT_CHUNK", 1000))
+TASKS_IMPORT_CHUNK = int(os.getenv("TASKS_IMPORT_CHUNK", 500))
+TASKS_IMPORT_MAX_ERRORS = int(os.getenv("TASKS_IMPORT_MAX_ERRORS", 100))
+TASKS_IMPORT_MAX_LINE_BYTES = int(os.getenv("TASKS_IMPORT_MAX_LINE_BYTES", 65536))
+# The archival job (python -m app.services.archive) moves tasks in this status older than the cutoff to tasks_archive
+TASKS_ARCHIVE_STATUS = os.getenv("TASKS_ARCHIVE_STATUS", "done")
+TASKS_ARCHIVE_AFTER_DAYS = int(os.getenv("TASKS_ARCHIVE_AFTER_DAYS", 90))
+TASKS_ARCHIVE_BATCH = int(os.getenv("TASKS_ARCHIVE_BATCH", 1000))
+
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Connections each database server accepts from the whole deployment, split between workers. The default fits
+# PostgreSQL's max_connections=100 with room for migrations and psql; 0 keeps SQLAlchemy's pool defaults per worker
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 90))
+
+TASK_LIST_CACHE_SIZE = int(os.getenv("TASK_LIST_CACHE_SIZE", 1024))
+
+# GET /tasks/stream: frames buffered per slow client, events kept per user for Last-Event-ID resume
+TASK_STREAM_QUEUE_SIZE = int(os.getenv("TASK_STREAM_QUEUE_SIZE", 100))
+TASK_STREAM_HISTORY = int(os.getenv("TASK_STREAM_HISTORY", 100))
+TASK_STREAM_HISTORY_USERS = int(os.getenv("TASK_STREAM_HISTORY_USERS", 1000))
+TASK_STREAM_HEARTBEAT_SECONDS = float(os.getenv("TASK_STREAM_HEARTBEAT_SECONDS", 15))
+
+# Comma-separated read replica URLs; empty means every query goes to DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# Apply pending migrations at startup instead of only checking the schema version (development only)
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+
+# "auto" uses Postgres LISTEN/NOTIFY on PostgreSQL and in-process delivery elsewhere
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "auto")
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "cache_invalidation")
+
+# Admission control for expensive routes: concurrent requests per worker (0 disables) and the longest wait for a slot
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes")
+ADMISSION_AUTH_CONCURRENCY = int(os.getenv("ADMISSION_AUTH_CONCURRENCY", 32))
+ADMISSION_LIST_CONCURRENCY = int(os.getenv("ADMISSION_LIST_CONCURRENCY", 64))
+ADMISSION_BULK_CONCURRENCY = int(os.getenv("ADMISSION_BULK_CONCURRENCY", 4))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 0.5))
+# Rate limits as "requests/seconds": auth per client IP, task reads and bulk writes per user; "0" disables
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "20/60")
+RATE_LIMIT_READS = os.getenv("RATE_LIMIT_READS", "600/60")
+RATE_LIMIT_BULK = os.getenv("RATE_LIMIT_BULK", "30/60")
+# "memory" keeps buckets per worker; "database" shares them through the rate_limits table
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_KEYS = int(os.getenv("RATE_LIMIT_KEYS", 100000))
+
+# Enables the /admin endpoints and X-Profile requests; empty keeps them disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+# Fraction of requests profiled without the admin header; profiles are folded stacks for flamegraph.pl/speedscope
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 1))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Newest profiles kept in PROFILE_DIR; older files are deleted as new ones are written
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 200))
+SLOW_REQUESTS_KEEP = int(os.getenv("SLOW_REQUESTS_KEEP", 50))
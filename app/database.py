@@ -1,8 +1,39 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from .config import DATABASE_URL
+from .config import DATABASE_URL, DATABASE_REPLICA_URLS, DB_ECHO, DB_MAX_CONNECTIONS, REPLICA_RETRY_SECONDS, WEB_CONCURRENCY
+from .services.instrumentation import InstrumentedQueuePool, instrument_engine, pool_gauges
+from .services.invalidation import resolve_bus_backend
+from .services.replicas import ReplicaRouter
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+def worker_pool_limits(budget: int, workers: int, reserved: int = 0) -> dict:
+    """Split a server-wide connection budget into one worker's pool_size and max_overflow.
+
+    ``reserved`` connections per worker are held outside the pool (the invalidation listener).
+    A quarter of each share is kept as overflow so idle workers do not pin the whole budget.
+    """
+    share = max(1, budget // workers - reserved)
+    overflow = share // 4
+    return {"pool_size": share - overflow, "max_overflow": overflow}
+
+def _engine_options(url: str, reserved: int = 0) -> dict:
+    parsed = make_url(url)
+    # in-memory SQLite needs its default single-connection pool
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    options = {"poolclass": InstrumentedQueuePool}
+    if DB_MAX_CONNECTIONS:
+        options.update(worker_pool_limits(DB_MAX_CONNECTIONS, WEB_CONCURRENCY, reserved))
+    return options
+
+def create_engine(url: str, reserved: int = 0):
+    engine = create_async_engine(url, echo=DB_ECHO, **_engine_options(url, reserved))
+    instrument_engine(engine)
+    return engine
+
+engine = create_engine(DATABASE_URL, reserved=1 if resolve_bus_backend() == "postgres" else 0)
+pool_gauges(engine)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-Base = declarative_base()
\ No newline at end of file
+replica_router = ReplicaRouter([create_engine(url) for url in DATABASE_REPLICA_URLS], REPLICA_RETRY_SECONDS)
+Base = declarative_base()
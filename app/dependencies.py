@@ -1,10 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
+from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from .database import AsyncSessionLocal
+from .database import AsyncSessionLocal, replica_router
 from .models.user import User
-from .services.auth_service import verify_token
+from .services.auth_service import decode_access_token, get_cached_principal, cache_principal
+from .config import ADMIN_TOKEN
+from .services.profiling import is_admin_token, timed
+from .services.replicas import wants_primary
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -12,12 +15,34 @@ async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    payload = verify_token(token)
-    if payload is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = await db.execute(select(User).filter(User.email == payload.get("sub")))
-    user = user.scalars().first()
+async def get_read_db(request: Request):
+    """Session for read-only handlers: a replica unless the client asked for read-your-writes."""
+    async with replica_router.session(AsyncSessionLocal, wants_primary(request.headers, request.cookies)) as session:
+        yield session
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
+    with timed("auth"):
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        user_id = payload.get("uid")
+        if user_id is not None:
+            principal = get_cached_principal(user_id)
+            if principal is not None:
+                return principal
+            query = select(User).filter(User.id == user_id)
+        else:
+            query = select(User).filter(User.email == payload.get("sub"))
+    with timed("user"):
+        async with replica_router.session(AsyncSessionLocal, wants_primary(request.headers, request.cookies)) as db:
+            user = await db.execute(query)
+            user = user.scalars().first()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
\ No newline at end of file
+    return cache_principal(user)
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -1,20 +1,42 @@
 from fastapi import FastAPI
-from .database import engine, Base
-from .routes import auth, task
-
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+from .config import ADMISSION_CONTROL, AUTO_MIGRATE, READ_YOUR_WRITES_SECONDS
+from .database import engine, replica_router
+from .migrations import check_schema, upgrade
+from .routes import admin, auth, health, metrics, task
+from .services.admission import AdmissionMiddleware
+from .services.instrumentation import RequestMetricsMiddleware
+from .services.invalidation import invalidation_bus
+from .services.password_hasher import password_hasher
+from .services.profiling import ProfilingMiddleware
+from .services.replicas import ReadYourWritesMiddleware
 
 app = FastAPI()
+app.add_middleware(ProfilingMiddleware)
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+if replica_router.engines:
+    app.add_middleware(ReadYourWritesMiddleware, window=READ_YOUR_WRITES_SECONDS)
 
 app.include_router(auth.router)
 app.include_router(task.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.include_router(admin.router)
 
 @app.on_event("startup")
 async def startup():
-    await create_tables()
+    if AUTO_MIGRATE:
+        await upgrade(engine)
+    else:
+        await check_schema(engine)
+    await invalidation_bus.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await invalidation_bus.stop()
+    password_hasher.shutdown()
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    from .server import main
+    main()
@@ -0,0 +1,52 @@
+"""Versioned schema migrations.
+
+Each ``mNNNN_*`` module defines ``upgrade(connection)``, run with a synchronous
+connection inside its own transaction. The applied version is kept in the
+single-row ``schema_version`` table. Apply pending migrations out-of-band with
+``python -m app.migrations upgrade``; application startup only checks the version.
+"""
+import importlib
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+MIGRATIONS = [
+    "m0001_initial",
+    "m0002_task_versions_and_indexes",
+    "m0003_rate_limits",
+    "m0004_tasks_archive",
+]
+HEAD = len(MIGRATIONS)
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+async def current_version(engine) -> int:
+    async with engine.connect() as conn:
+        try:
+            return (await conn.execute(text("SELECT version FROM schema_version"))).scalar() or 0
+        except DBAPIError:
+            return 0
+
+async def upgrade(engine, target: int = HEAD) -> int:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        version = (await conn.execute(text("SELECT version FROM schema_version"))).scalar()
+        if version is None:
+            version = 0
+            await conn.execute(text("INSERT INTO schema_version (version) VALUES (0)"))
+    for number in range(version + 1, target + 1):
+        migration = importlib.import_module(f"{__name__}.{MIGRATIONS[number - 1]}")
+        async with engine.begin() as conn:
+            await conn.run_sync(migration.upgrade)
+            await conn.execute(text("UPDATE schema_version SET version = :version"), {"version": number})
+    return max(version, target)
+
+async def check_schema(engine):
+    """Fail fast when the database is behind this code; a newer schema is allowed during rollouts."""
+    version = await current_version(engine)
+    if version < HEAD:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, the application needs {HEAD}. "
+            "Run `python -m app.migrations upgrade`."
+        )
+    return version
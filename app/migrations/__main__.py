@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+from . import HEAD, current_version, upgrade
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, default=HEAD, help="target version (default: latest)")
+    commands.add_parser("current", help="print the applied schema version")
+    args = parser.parse_args(argv)
+
+    from ..database import engine
+    try:
+        if args.command == "upgrade":
+            before = await current_version(engine)
+            after = await upgrade(engine, args.to)
+            print(f"schema version {before} -> {after}")
+        else:
+            print(f"schema version {await current_version(engine)} (latest {HEAD})")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+"""Baseline schema, as created by the original create_all at startup."""
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("hashed_password", String),
+)
+
+Table(
+    "tasks", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String, index=True),
+    Column("description", String, nullable=True),
+    Column("status", String),
+    Column("priority", Integer),
+    Column("created_at", DateTime),
+    Column("owner_id", Integer, ForeignKey("users.id")),
+)
+
+def upgrade(conn):
+    # checkfirst keeps databases that were created by create_all before migrations existed
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,22 @@
+"""Task versions, per-user tasks version, owner-scoped indexes and the Postgres search document."""
+from sqlalchemy import inspect, text
+from ..config import SEARCH_TS_CONFIG
+
+def _add_column(conn, table, column, ddl):
+    if column not in {existing["name"] for existing in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+def upgrade(conn):
+    _add_column(conn, "tasks", "version", "INTEGER NOT NULL DEFAULT 1")
+    _add_column(conn, "users", "tasks_version", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(text("DROP INDEX IF EXISTS ix_tasks_title"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_owner_created ON tasks (owner_id, created_at, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_owner_status_created ON tasks (owner_id, status, created_at, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_owner_priority ON tasks (owner_id, priority, id)"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{SEARCH_TS_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_TS_CONFIG}'::regconfig, coalesce(description, '')), 'B')) STORED"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)"))
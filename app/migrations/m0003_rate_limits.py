@@ -0,0 +1,5 @@
+"""Table backing the database rate limiter."""
+from sqlalchemy import text
+
+def upgrade(conn):
+    conn.execute(text("CREATE TABLE IF NOT EXISTS rate_limits (key VARCHAR(200) PRIMARY KEY, tat FLOAT NOT NULL)"))
@@ -0,0 +1,14 @@
+"""Archive table for old finished tasks, range-partitioned by created_at on PostgreSQL."""
+from sqlalchemy import text
+
+def upgrade(conn):
+    partitioning = " PARTITION BY RANGE (created_at)" if conn.dialect.name == "postgresql" else ""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS tasks_archive ("
+        "id INTEGER NOT NULL, title VARCHAR, description VARCHAR, status VARCHAR, priority INTEGER, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, owner_id INTEGER REFERENCES users (id), "
+        "version INTEGER NOT NULL DEFAULT 1, archived_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        f"PRIMARY KEY (id, created_at)){partitioning}"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_archive_owner_created ON tasks_archive (owner_id, created_at, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_archive_owner_priority ON tasks_archive (owner_id, priority, id)"))
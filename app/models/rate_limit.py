@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Float, String
+from ..database import Base
+
+class RateLimit(Base):
+    """Shared rate limiter state: the theoretical arrival time of the next request per key (GCRA)."""
+    __tablename__ = "rate_limits"
+    key = Column(String(200), primary_key=True)
+    tat = Column(Float, nullable=False)
@@ -1,15 +1,58 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
+from ..config import SEARCH_TS_CONFIG
 from ..database import Base
 from datetime import datetime
 
 class Task(Base):
     __tablename__ = "tasks"
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
+    title = Column(String)
     description = Column(String, nullable=True)
     status = Column(String, default="pending")
     priority = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
     owner_id = Column(Integer, ForeignKey("users.id"))
-    owner = relationship("User", back_populates="tasks")
\ No newline at end of file
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    owner = relationship("User", back_populates="tasks")
+
+    # Every task query filters on owner_id first; the trailing columns match the keyset orderings
+    __table_args__ = (
+        Index("ix_tasks_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_tasks_owner_status_created", "owner_id", "status", "created_at", "id"),
+        Index("ix_tasks_owner_priority", "owner_id", "priority", "id"),
+    )
+
+class TaskArchive(Base):
+    """Tasks moved out of ``tasks`` by the archival job, with the same columns and ids.
+
+    On PostgreSQL the table is range-partitioned by created_at, one partition per year,
+    created by the job as it needs them; old years can be detached or dropped cheaply.
+    """
+    __tablename__ = "tasks_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    status = Column(String)
+    priority = Column(Integer)
+    # part of the key because a partitioned table's primary key must include the partition column
+    created_at = Column(DateTime, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"))
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_tasks_archive_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_tasks_archive_owner_priority", "owner_id", "priority", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+# PostgreSQL keeps the search document itself; it is not mapped because only search queries read it
+event.listen(Task.__table__, "after_create", DDL(
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_TS_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_TS_CONFIG}'::regconfig, coalesce(description, '')), 'B')) STORED"
+).execute_if(dialect="postgresql"))
+event.listen(Task.__table__, "after_create", DDL(
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)"
+).execute_if(dialect="postgresql"))
@@ -8,4 +8,6 @@ class User(Base):
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
+    # bumped in the same transaction as every write to this user's tasks
+    tasks_version = Column(Integer, nullable=False, default=0, server_default="0")
     tasks = relationship("Task", back_populates="owner")
\ No newline at end of file
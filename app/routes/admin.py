@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from ..dependencies import require_admin
+from ..services.profiling import profile_path, slow_requests
+
+router = APIRouter(tags=["Admin"], prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.get(
+    "/slow-requests",
+    summary="Самые медленные запросы",
+    description="Возвращает самые медленные запросы, обработанные этим воркером, с разбивкой времени по фазам (авторизация, загрузка пользователя, запрос к базе, преобразование строк, сериализация), суммарным временем SQL и идентификатором профиля, если запрос профилировался. Для потоковых ответов (`streamed`) учитывается время до первого байта, потоки событий в список не попадают. Требуется заголовок `X-Admin-Token`.",
+    responses={
+        200: {
+            "description": "Список запросов, от самого медленного",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "method": "GET",
+                            "path": "/tasks",
+                            "query": "status=open&limit=200",
+                            "status": 200,
+                            "duration_ms": 182.4,
+                            "streamed": False,
+                            "phases_ms": {"auth": 0.05, "version": 1.2, "query": 160.3, "hydrate": 9.8, "serialize": 4.1},
+                            "db_ms": 158.7,
+                            "queries": 2,
+                            "started_at": "2025-05-07T12:00:00+00:00",
+                            "profile_id": None
+                        }
+                    ]
+                }
+            }
+        },
+        403: {"description": "Неверный токен администратора"},
+        404: {"description": "Администрирование отключено (не задан ADMIN_TOKEN)"}
+    }
+)
+async def get_slow_requests():
+    return slow_requests.entries()
+
+@router.delete(
+    "/slow-requests",
+    status_code=204,
+    summary="Очистить список медленных запросов",
+    description="Очищает список медленных запросов этого воркера, например после исправления найденной проблемы.",
+    responses={
+        403: {"description": "Неверный токен администратора"},
+        404: {"description": "Администрирование отключено (не задан ADMIN_TOKEN)"}
+    }
+)
+async def clear_slow_requests():
+    slow_requests.clear()
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_class=FileResponse,
+    summary="Профиль запроса",
+    description="Отдаёт профиль запроса в формате folded stacks (по строке `функция;функция;... число_выборок`), который открывается в speedscope или flamegraph.pl. Идентификатор профиля приходит в заголовке ответа `X-Profile-Id` на запрос с заголовком `X-Profile: <ADMIN_TOKEN>`.",
+    responses={
+        200: {"description": "Файл профиля", "content": {"text/plain": {}}},
+        403: {"description": "Неверный токен администратора"},
+        404: {"description": "Профиль не найден"}
+    }
+)
+async def get_profile(profile_id: str):
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -4,12 +4,19 @@ from sqlalchemy.future import select
 from ..dependencies import get_db
 from ..models.user import User
 from ..schemas.user import UserCreate, UserLogin
-from ..services.auth_service import get_password_hash, create_access_token, create_refresh_token, verify_token
-from ..services.auth_service import verify_password
+from ..services.auth_service import create_access_token, create_refresh_token, verify_token
+from ..services.password_hasher import HashQueueFull, password_hasher
 from fastapi.responses import JSONResponse
 
 router = APIRouter(tags=["Authentication"], prefix="/auth")
 
+def _hasher_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent authentication requests",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post(
     "/register",
     summary="Регистрация нового пользователя",
@@ -27,11 +34,17 @@ router = APIRouter(tags=["Authentication"], prefix="/auth")
         },
         422: {
             "description": "Некорректные входные данные (например, неверный формат email или слабый пароль)"
+        },
+        503: {
+            "description": "Очередь хеширования паролей переполнена, повторите запрос позже"
         }
     }
 )
 async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HashQueueFull:
+        raise _hasher_busy()
     db_user = User(name=user.name, email=user.email, hashed_password=hashed_password)
     db.add(db_user)
     await db.commit()
@@ -67,16 +80,28 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
         },
         422: {
             "description": "Некорректные входные данные"
+        },
+        503: {
+            "description": "Очередь хеширования паролей переполнена, повторите запрос позже"
         }
     }
 )
 async def login(form_data: UserLogin = Depends(), db: AsyncSession = Depends(get_db)):
     user = await db.execute(select(User).filter(User.email == form_data.email))
     user = user.scalars().first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    try:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    except HashQueueFull:
+        raise _hasher_busy()
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
+    refresh_token = create_refresh_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post(
@@ -118,5 +143,5 @@ async def refresh(refresh_token: str, db: AsyncSession = Depends(get_db)):
     user = user.scalars().first()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
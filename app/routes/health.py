@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+
+router = APIRouter(tags=["Monitoring"])
+
+@router.get(
+    "/health",
+    summary="Проверка работоспособности",
+    description="Лёгкая проверка готовности процесса обслуживать запросы. Не обращается к базе данных.",
+    responses={
+        200: {
+            "description": "Сервис работает",
+            "content": {"application/json": {"example": {"status": "ok"}}}
+        }
+    }
+)
+async def health():
+    return {"status": "ok"}
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..services.metrics import registry
+
+router = APIRouter(tags=["Monitoring"])
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Метрики Prometheus",
+    description="Возвращает счётчики и гистограммы сервиса в текстовом формате Prometheus: число и длительность SQL-запросов на HTTP-запрос, медленные запросы, ожидание и загрузку пула соединений, очередь хеширования паролей.",
+    responses={
+        200: {"description": "Метрики в формате Prometheus text exposition 0.0.4"}
+    }
+)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
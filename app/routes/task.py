@@ -1,16 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from typing import Optional, List
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from ..dependencies import get_db, get_current_user
+from ..database import AsyncSessionLocal
+from ..dependencies import get_db, get_read_db, get_current_user
 from ..models.task import Task
-from ..models.user import User
-from ..schemas.task import TaskCreate, TaskUpdate, TaskOut
+from ..services.auth_service import Principal
+from ..schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskPage, TaskSearchPage, TaskOperation, TaskBatchResult, TaskImportResult
+from ..services.profiling import timed
+from ..services.pagination import ORDER_BY_CHOICES, decode_cursor, paginate, paginate_union, split_page
+from ..services.search import SEARCH_ORDER_BY_CHOICES, build_hit, search_backend, split_hits, tokenize
+from ..services.change_version import bump_tasks_version, get_tasks_version, publish_tasks_changed, task_list_cache
+from ..services.etag import if_none_match, list_etag, parse_if_match, task_etag
+from ..services.serialization import iter_page, render_page, task_row
+from ..services.task_batch import execute_batch
+from ..services.task_events import task_event_hub
+from ..services.task_transfer import FORMATS, export_tasks, import_tasks
+from ..services.write_coalescer import task_create_coalescer
+from ..services.replicas import wants_primary
+from ..services.task_queries import archived_task_list_query, task_list_query
+from ..config import TASKS_PAGE_SIZE, TASKS_PAGE_SIZE_MAX, TASKS_BATCH_MAX
 from datetime import datetime
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 router = APIRouter(tags=["Tasks"], prefix="/tasks")
 
+def _check_order_by(order_by: str, choices: List[str] = ORDER_BY_CHOICES):
+    if order_by not in choices:
+        raise HTTPException(status_code=422, detail=f"order_by must be one of: {', '.join(choices)}")
+
+def _decode_cursor(cursor: Optional[str], order_by: str):
+    if cursor is None:
+        return None
+    decoded = decode_cursor(cursor, order_by)
+    if decoded is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return decoded
+
+async def _conditional_page(request: Request, db: AsyncSession, user_id: int, load_page, stream: bool = False):
+    """Answer a list request from its ETag or the response cache before running load_page."""
+    with timed("version"):
+        version = await get_tasks_version(db, user_id)
+    params = tuple(sorted(request.query_params.multi_items()))
+    headers = {"ETag": list_etag(user_id, version, params)}
+    if if_none_match(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    cache_key = (user_id, request.url.path, params, version)
+    body = task_list_cache.get(cache_key)
+    if body is None:
+        items, next_cursor = await load_page()
+        if stream:
+            return StreamingResponse(iter_page(items, next_cursor), media_type="application/json", headers=headers)
+        with timed("serialize"):
+            body = render_page(items, next_cursor)
+        task_list_cache.set(cache_key, body)
+    return Response(body, media_type="application/json", headers=headers)
+
 @router.post(
     "",
     response_model=TaskOut,
@@ -28,7 +74,8 @@ router = APIRouter(tags=["Tasks"], prefix="/tasks")
                         "status": "open",
                         "priority": 1,
                         "owner_id": 1,
-                        "created_at": "2025-05-07T12:00:00Z"
+                        "created_at": "2025-05-07T12:00:00Z",
+                        "version": 1
                     }
                 }
             }
@@ -39,20 +86,74 @@ router = APIRouter(tags=["Tasks"], prefix="/tasks")
 )
 async def create_task(
     task: TaskCreate,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    db_task = Task(**task.dict(), owner_id=current_user.id)
-    db.add(db_task)
-    await db.commit()
-    await db.refresh(db_task)
+    if task_create_coalescer is not None:
+        db_task = await task_create_coalescer.create(current_user.id, task.dict())
+    else:
+        db_task = await db.scalar(insert(Task).values(**task.dict(), owner_id=current_user.id).returning(Task))
+        version = await bump_tasks_version(db, current_user.id)
+        await db.commit()
+        search_backend.index(db_task)
+        publish_tasks_changed(current_user.id, version, [db_task])
+    response.headers["ETag"] = task_etag(db_task.version)
     return db_task
 
+@router.post(
+    "/batch",
+    response_model=List[TaskBatchResult],
+    summary="Пакетное изменение задач",
+    description="Выполняет список операций create/update/delete над задачами текущего пользователя в одной транзакции. Создания выполняются одним многострочным INSERT, обновления и удаления — по одному оператору на вид операции. Для каждой операции возвращается собственный статус. Каждый ID задачи может встречаться в пакете только один раз.",
+    responses={
+        200: {
+            "description": "Операции выполнены, статус каждой операции указан в ответе",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "index": 0,
+                            "op": "create",
+                            "status": 200,
+                            "task": {
+                                "id": 3,
+                                "title": "Новая задача",
+                                "description": None,
+                                "status": "pending",
+                                "priority": 1,
+                                "owner_id": 1,
+                                "created_at": "2025-05-07T12:00:00Z",
+                                "version": 1
+                            },
+                            "detail": None
+                        },
+                        {"index": 1, "op": "delete", "status": 404, "task": None, "detail": "Task not found"}
+                    ]
+                }
+            }
+        },
+        401: {"description": "Пользователь не аутентифицирован"},
+        422: {"description": "Некорректные входные данные, слишком много операций или повторяющиеся ID задач"}
+    }
+)
+async def batch_tasks(
+    operations: List[TaskOperation],
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if len(operations) > TASKS_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"A batch may contain at most {TASKS_BATCH_MAX} operations")
+    referenced = [operation.id for operation in operations if operation.op != "create"]
+    if len(referenced) != len(set(referenced)):
+        raise HTTPException(status_code=422, detail="A task id may appear in at most one operation of a batch")
+    return await execute_batch(db, current_user.id, operations)
+
 @router.put(
     "/{task_id}",
     response_model=TaskOut,
     summary="Обновить задачу",
-    description="Обновляет существующую задачу по её ID. Можно обновить только те поля, которые переданы в запросе. Задача должна принадлежать текущему пользователю.",
+    description="Обновляет существующую задачу по её ID. Можно обновить только те поля, которые переданы в запросе. Задача должна принадлежать текущему пользователю. Каждое обновление увеличивает `version`; передайте ETag задачи в заголовке `If-Match`, чтобы обновление применилось только к этой версии.",
     responses={
         200: {
             "description": "Задача успешно обновлена",
@@ -65,44 +166,58 @@ async def create_task(
                         "status": "in_progress",
                         "priority": 2,
                         "owner_id": 1,
-                        "created_at": "2025-05-07T12:00:00Z"
+                        "created_at": "2025-05-07T12:00:00Z",
+                        "version": 2
                     }
                 }
             }
         },
         401: {"description": "Пользователь не аутентифицирован"},
         404: {"description": "Задача не найдена"},
+        412: {"description": "Версия задачи не совпадает с заголовком If-Match"},
         422: {"description": "Некорректные входные данные"}
     }
 )
 async def update_task(
     task_id: int,
     task: TaskUpdate,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Task).filter(Task.id == task_id, Task.owner_id == current_user.id)
-    result = await db.execute(query)
-    db_task = result.scalars().first()
+    query = update(Task).filter(Task.id == task_id, Task.owner_id == current_user.id)
+    versions = parse_if_match(if_match) if if_match is not None else None
+    if versions is not None:
+        query = query.filter(Task.version.in_(versions))
+    query = query.values(**task.dict(exclude_unset=True), version=Task.version + 1).returning(Task)
+    db_task = (await db.scalars(query)).first()
     if db_task is None:
+        await db.rollback()
+        if versions is not None:
+            exists = await db.scalar(select(Task.id).filter(Task.id == task_id, Task.owner_id == current_user.id))
+            if exists is not None:
+                raise HTTPException(status_code=412, detail="Task was modified by another request")
         raise HTTPException(status_code=404, detail="Task not found")
-    for key, value in task.dict(exclude_unset=True).items():
-        setattr(db_task, key, value)
+    version = await bump_tasks_version(db, current_user.id)
     await db.commit()
-    await db.refresh(db_task)
+    search_backend.index(db_task)
+    publish_tasks_changed(current_user.id, version, [db_task])
+    response.headers["ETag"] = task_etag(db_task.version)
     return db_task
 
 @router.get(
     "",
-    response_model=List[TaskOut],
+    response_model=TaskPage,
     summary="Получить список задач",
-    description="Возвращает список задач текущего пользователя с возможностью фильтрации по статусу, приоритету или дате создания.",
+    description="Возвращает страницу задач текущего пользователя с возможностью фильтрации по статусу, приоритету или дате создания. Для получения следующей страницы передайте `next_cursor` в параметре `cursor`. С параметром `stream=true` массив задач отдаётся частями. Задачи, перенесённые в архив, возвращаются только с `include_archived=true`.",
     responses={
         200: {
-            "description": "Список задач успешно возвращён",
+            "description": "Страница задач успешно возвращена",
             "content": {
                 "application/json": {
-                    "example": [
+                    "example": {
+                      "items": [
                         {
                             "id": 1,
                             "title": "Задача 1",
@@ -110,7 +225,8 @@ async def update_task(
                             "status": "open",
                             "priority": 1,
                             "owner_id": 1,
-                            "created_at": "2025-05-07T12:00:00Z"
+                            "created_at": "2025-05-07T12:00:00Z",
+                            "version": 1
                         },
                         {
                             "id": 2,
@@ -119,43 +235,62 @@ async def update_task(
                             "status": "closed",
                             "priority": 2,
                             "owner_id": 1,
-                            "created_at": "2025-05-07T13:00:00Z"
+                            "created_at": "2025-05-07T13:00:00Z",
+                            "version": 1
                         }
-                    ]
+                      ],
+                      "next_cursor": "eyJvIjoiY3JlYXRlZF9hdCIsInYiOiIyMDI1LTA1LTA3VDEzOjAwOjAwIiwiaWQiOjJ9"
+                    }
                 }
             }
         },
+        304: {"description": "Задачи не изменились с момента выдачи ETag из заголовка If-None-Match"},
+        400: {"description": "Некорректный курсор"},
         401: {"description": "Пользователь не аутентифицирован"}
     }
 )
 async def get_tasks(
+    request: Request,
     status: Optional[str] = None,
     priority: Optional[int] = None,
     created_at: Optional[datetime] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(TASKS_PAGE_SIZE, ge=1, le=TASKS_PAGE_SIZE_MAX),
+    order_by: str = "created_at",
+    stream: bool = False,
+    include_archived: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Task).filter(Task.owner_id == current_user.id)
-    if status:
-        query = query.filter(Task.status == status)
-    if priority:
-        query = query.filter(Task.priority == priority)
-    if created_at:
-        query = query.filter(Task.created_at >= created_at)
-    result = await db.execute(query)
-    return result.scalars().all()
+    _check_order_by(order_by)
+    decoded_cursor = _decode_cursor(cursor, order_by)
+
+    async def load_page():
+        query = task_list_query(current_user.id, status, priority, created_at, entity=Task.__table__)
+        if include_archived:
+            archived = archived_task_list_query(current_user.id, status, priority, created_at)
+            query = paginate_union([query, archived], order_by, decoded_cursor, limit)
+        else:
+            query = paginate(query, order_by, decoded_cursor, limit)
+        with timed("query"):
+            rows, next_cursor = split_page((await db.execute(query)).all(), order_by, limit)
+        with timed("hydrate"):
+            return [task_row(row) for row in rows], next_cursor
+
+    return await _conditional_page(request, db, current_user.id, load_page, stream)
 
 @router.get(
     "/search",
-    response_model=List[TaskOut],
+    response_model=TaskSearchPage,
     summary="Поиск задач",
-    description="Ищет задачи текущего пользователя по ключевому слову в заголовке или описании задачи.",
+    description="Полнотекстовый поиск по заголовку и описанию задач текущего пользователя. Каждое слово запроса ищется как префикс, результаты по умолчанию упорядочены по релевантности и содержат подсвеченные фрагменты. Результаты разбиты на страницы так же, как в списке задач.",
     responses={
         200: {
             "description": "Результаты поиска успешно возвращены",
             "content": {
                 "application/json": {
-                    "example": [
+                    "example": {
+                      "items": [
                         {
                             "id": 1,
                             "title": "Задача 1",
@@ -163,23 +298,143 @@ async def get_tasks(
                             "status": "open",
                             "priority": 1,
                             "owner_id": 1,
-                            "created_at": "2025-05-07T12:00:00Z"
+                            "created_at": "2025-05-07T12:00:00Z",
+                            "version": 1,
+                            "rank": 0.5,
+                            "highlights": {
+                                "title": "Задача 1",
+                                "description": "Описание с <mark>ключевым</mark> словом"
+                            }
                         }
-                    ]
+                      ],
+                      "next_cursor": None
+                    }
                 }
             }
         },
+        304: {"description": "Задачи не изменились с момента выдачи ETag из заголовка If-None-Match"},
+        400: {"description": "Некорректный курсор"},
         401: {"description": "Пользователь не аутентифицирован"},
         422: {"description": "Параметр поиска отсутствует или некорректен"}
     }
 )
 async def search_tasks(
+    request: Request,
     q: str,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(TASKS_PAGE_SIZE, ge=1, le=TASKS_PAGE_SIZE_MAX),
+    order_by: str = "rank",
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    _check_order_by(order_by, SEARCH_ORDER_BY_CHOICES)
+    decoded_cursor = _decode_cursor(cursor, order_by)
+
+    async def load_page():
+        with timed("query"):
+            rows = await search_backend.search(db, current_user.id, q, order_by, decoded_cursor, limit)
+        rows, next_cursor = split_hits(rows, order_by, limit)
+        terms = tokenize(q)
+        with timed("hydrate"):
+            return [build_hit(task, rank, terms) for task, rank in rows], next_cursor
+
+    return await _conditional_page(request, db, current_user.id, load_page)
+
+@router.get(
+    "/stream",
+    summary="Поток изменений задач",
+    description="Открывает поток Server-Sent Events с изменениями задач текущего пользователя вместо периодического опроса списка. Событие `tasks` содержит созданные или изменённые задачи (у только что созданных `version` равна 1) и идентификаторы удалённых; его `id` — версия списка задач пользователя. При переподключении с заголовком `Last-Event-ID` пропущенные события отправляются повторно. Если восстановить их нельзя или клиент не успевает читать поток, приходит событие `resync`: нужно заново загрузить список задач. Каждые несколько секунд без событий отправляется комментарий keepalive.",
+    responses={
+        200: {
+            "description": "Поток событий открыт",
+            "content": {
+                "text/event-stream": {
+                    "example": "id: 42\nevent: tasks\ndata: {\"version\":42,\"tasks\":[{\"id\":1,\"title\":\"Задача 1\",\"description\":null,\"status\":\"open\",\"priority\":1,\"owner_id\":1,\"created_at\":\"2025-05-07T12:00:00\",\"version\":2}],\"deleted\":[]}\n\n"
+                }
+            }
+        },
+        400: {"description": "Некорректный заголовок Last-Event-ID"},
+        401: {"description": "Пользователь не аутентифицирован"}
+    }
+)
+async def stream_tasks(
+    last_event_id: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    # subscribe before reading the version so no event falls between the two
+    subscription = task_event_hub.subscribe(current_user.id)
+    try:
+        async with AsyncSessionLocal() as db:
+            version = await get_tasks_version(db, current_user.id)
+    except BaseException:
+        task_event_hub.unsubscribe(subscription)
+        raise
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(task_event_hub.stream(subscription, after, version), media_type="text/event-stream", headers=headers)
+
+
+@router.get(
+    "/export",
+    summary="Экспорт задач",
+    description="Выгружает все задачи текущего пользователя в формате NDJSON (по задаче в строке) или CSV (с заголовком). Задачи из архива тоже выгружаются, если не передан `include_archived=false`. Файл формируется частями по мере чтения из базы, поэтому подходит для любого числа задач.",
+    responses={
+        200: {
+            "description": "Файл с задачами",
+            "content": {
+                "application/x-ndjson": {
+                    "example": "{\"id\":1,\"title\":\"Задача 1\",\"description\":null,\"status\":\"open\",\"priority\":1,\"created_at\":\"2025-05-07T12:00:00\",\"owner_id\":1,\"version\":1}\n"
+                },
+                "text/csv": {
+                    "example": "id,title,description,status,priority,created_at,owner_id,version\r\n1,Задача 1,,open,1,2025-05-07T12:00:00,1,1\r\n"
+                }
+            }
+        },
+        401: {"description": "Пользователь не аутентифицирован"},
+        422: {"description": "Неизвестный формат"}
+    }
+)
+async def export_tasks_file(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    include_archived: bool = True,
+    current_user: Principal = Depends(get_current_user)
+):
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{fmt}"'}
+    body = export_tasks(current_user.id, fmt, wants_primary(request.headers, request.cookies), include_archived)
+    return StreamingResponse(body, media_type=FORMATS[fmt], headers=headers)
+
+@router.post(
+    "/import",
+    response_model=TaskImportResult,
+    summary="Импорт задач",
+    description="Создаёт задачи из тела запроса в формате NDJSON (объект задачи в каждой строке) или CSV (первая строка — заголовок с именами полей). Формат берётся из параметра `format` или из Content-Type (`text/csv` — CSV, иначе NDJSON). Каждая строка проверяется как тело `POST /tasks`, поля `id`, `owner_id`, `created_at` и `version` игнорируются, так что файл экспорта можно загрузить обратно. Корректные строки сохраняются пачками, ошибочные пропускаются и перечисляются в отчёте с номером строки.",
+    responses={
+        200: {
+            "description": "Импорт завершён, в отчёте указано число созданных и пропущенных задач",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "imported": 2,
+                        "failed": 1,
+                        "errors": [{"line": 3, "detail": "priority: Field required"}]
+                    }
+                }
+            }
+        },
+        401: {"description": "Пользователь не аутентифицирован"},
+        422: {"description": "Неизвестный формат"}
+    }
+)
+async def import_tasks_file(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$"),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Task).filter(Task.owner_id == current_user.id).filter(
-        (Task.title.contains(q)) | (Task.description.contains(q))
-    )
-    result = await db.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    if fmt is None:
+        fmt = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+    return await import_tasks(db, current_user.id, fmt, request.stream())
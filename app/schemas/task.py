@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Annotated, Optional, List, Literal, Union
 from datetime import datetime
 
 
@@ -23,5 +23,56 @@ class TaskOut(BaseModel):
     priority: int
     created_at: datetime
     owner_id: int
+    version: int
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+class TaskPage(BaseModel):
+    items: List[TaskOut]
+    next_cursor: Optional[str] = None
+
+class TaskHighlights(BaseModel):
+    title: str
+    description: Optional[str]
+
+class TaskSearchHit(TaskOut):
+    rank: float
+    highlights: TaskHighlights
+
+class TaskSearchPage(BaseModel):
+    items: List[TaskSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class TaskCreateOperation(BaseModel):
+    op: Literal["create"]
+    task: TaskCreate
+
+class TaskUpdateOperation(BaseModel):
+    op: Literal["update"]
+    id: int
+    task: TaskUpdate
+
+class TaskDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+TaskOperation = Annotated[
+    Union[TaskCreateOperation, TaskUpdateOperation, TaskDeleteOperation], Field(discriminator="op")
+]
+
+class TaskBatchResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    task: Optional[TaskOut] = None
+    detail: Optional[str] = None
+
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+class TaskImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TaskImportError]
@@ -0,0 +1,57 @@
+"""Production entry point: ``python -m app.server``.
+
+Runs uvicorn's multiprocess supervisor, which pre-forks the workers, restarts any that
+die or stop answering health pings, replaces all of them one by one on SIGHUP and adds
+or removes one on SIGTTIN/SIGTTOU. Each worker reads WEB_CONCURRENCY to take its share
+of DB_MAX_CONNECTIONS and of the password hashing threads.
+"""
+import argparse
+import logging
+import os
+import uvicorn
+from dotenv import load_dotenv
+
+logger = logging.getLogger("app.server")
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 1
+
+def main(argv=None):
+    # the defaults below read WEB_CONCURRENCY, HOST and PORT, which may come from .env
+    load_dotenv()
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API with pre-forked workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=default_workers(), help="worker processes (default: CPU count)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", 30)),
+                        help="seconds a stopping worker waits for in-flight requests")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+                        help="comma-separated proxy addresses (or *) whose X-Forwarded-For is trusted")
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.workers)
+    # workers are spawned, so they re-read the environment when importing app.config
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    from .config import DB_MAX_CONNECTIONS
+    from .services.invalidation import resolve_bus_backend
+
+    if workers > 1 and resolve_bus_backend() == "local":
+        logger.warning("In-process invalidation bus with %d workers: caches are coherent only per worker", workers)
+    if not DB_MAX_CONNECTIONS and workers > 1:
+        logger.warning("DB_MAX_CONNECTIONS=0: each of %d workers may open up to 15 connections", workers)
+    elif DB_MAX_CONNECTIONS and DB_MAX_CONNECTIONS < workers * 2:
+        logger.warning("DB_MAX_CONNECTIONS=%d leaves fewer than two connections per worker", DB_MAX_CONNECTIONS)
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Tuple
+from sqlalchemy import text
+from starlette.responses import JSONResponse
+from ..config import (
+    ADMISSION_AUTH_CONCURRENCY, ADMISSION_BULK_CONCURRENCY, ADMISSION_LIST_CONCURRENCY, ADMISSION_QUEUE_TIMEOUT,
+    RATE_LIMIT_AUTH, RATE_LIMIT_BACKEND, RATE_LIMIT_BULK, RATE_LIMIT_KEYS, RATE_LIMIT_READS,
+)
+from .auth_service import decode_access_token
+from .cache import LRUCache
+from .metrics import registry
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Requests refused by admission control.", ["policy", "reason"]
+)
+ADMISSION_QUEUE_SECONDS = registry.histogram(
+    "admission_queue_seconds", "Time admitted requests waited for a concurrency slot.", ["policy"]
+)
+
+def parse_rate(spec: str) -> Optional[Tuple[float, int]]:
+    """``"20/60"`` means bursts of 20 requests refilled over 60 seconds; empty or ``"0"`` disables the limit."""
+    if not spec or spec.strip() == "0":
+        return None
+    count, _, seconds = spec.partition("/")
+    burst = int(count)
+    return burst / float(seconds or 1), burst
+
+
+class MemoryRateLimitBackend:
+    """Per-worker GCRA buckets; each key costs one float and idle keys are evicted LRU-first."""
+
+    def __init__(self, maxsize: int = RATE_LIMIT_KEYS):
+        self._tats = LRUCache(maxsize)
+
+    async def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        """Consume one token; return 0 when allowed, else the seconds until a token is available."""
+        now = time.time() if now is None else now
+        interval, tolerance = 1 / rate, (burst - 1) / rate
+        tat = max(self._tats.get(key, now), now)
+        if tat - tolerance > now:
+            return tat - tolerance - now
+        self._tats.set(key, tat + interval)
+        return 0.0
+
+
+class DatabaseRateLimitBackend:
+    """GCRA buckets in the ``rate_limits`` table, shared by every worker and host.
+
+    One upsert per check; the conditional ``DO UPDATE ... WHERE`` only moves the bucket
+    when the request is allowed, so a denied request returns no row.
+    """
+
+    TAKE = text(
+        "INSERT INTO rate_limits (key, tat) VALUES (:key, :now + :interval) "
+        "ON CONFLICT (key) DO UPDATE SET tat = CASE WHEN rate_limits.tat > :now THEN rate_limits.tat ELSE :now END + :interval "
+        "WHERE rate_limits.tat - :tolerance <= :now RETURNING tat"
+    )
+    PRUNE_EVERY = 1000
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._calls = 0
+
+    async def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        interval, tolerance = 1 / rate, (burst - 1) / rate
+        params = {"key": key, "now": now, "interval": interval, "tolerance": tolerance}
+        async with self.engine.begin() as conn:
+            if (await conn.execute(self.TAKE, params)).first() is not None:
+                self._calls += 1
+                if self._calls % self.PRUNE_EVERY == 0:
+                    # buckets that have fully refilled behave exactly like missing rows
+                    await conn.execute(text("DELETE FROM rate_limits WHERE tat < :now"), {"now": now})
+                return 0.0
+            tat = (await conn.execute(text("SELECT tat FROM rate_limits WHERE key = :key"), {"key": key})).scalar()
+        return max(tat - tolerance - now, 0.0)
+
+
+class ConcurrencyLimit:
+    """At most ``limit`` requests in flight; others wait up to ``timeout`` seconds for a slot."""
+
+    def __init__(self, limit: int, timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+@dataclass
+class AdmissionPolicy:
+    name: str
+    routes: FrozenSet[Tuple[str, str]]
+    concurrency: Optional[ConcurrencyLimit] = None
+    rate: Optional[Tuple[float, int]] = None
+    # "ip" keys every caller by address; "user" uses the token's user id and falls back to the address
+    rate_key: str = "user"
+
+
+def default_policies() -> List[AdmissionPolicy]:
+    def limit(size):
+        return ConcurrencyLimit(size, ADMISSION_QUEUE_TIMEOUT) if size > 0 else None
+
+    return [
+        AdmissionPolicy("auth", frozenset({("POST", "/auth/login"), ("POST", "/auth/register")}),
+                        limit(ADMISSION_AUTH_CONCURRENCY), parse_rate(RATE_LIMIT_AUTH), rate_key="ip"),
+        AdmissionPolicy("task_reads", frozenset({("GET", "/tasks"), ("GET", "/tasks/search"), ("GET", "/tasks/export")}),
+                        limit(ADMISSION_LIST_CONCURRENCY), parse_rate(RATE_LIMIT_READS)),
+        AdmissionPolicy("task_bulk", frozenset({("POST", "/tasks/batch"), ("POST", "/tasks/import")}),
+                        limit(ADMISSION_BULK_CONCURRENCY), parse_rate(RATE_LIMIT_BULK)),
+    ]
+
+def create_rate_limit_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    if name == "database":
+        from ..database import engine
+        return DatabaseRateLimitBackend(engine)
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+def _rate_key(scope, kind: str) -> str:
+    if kind == "user":
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                payload = decode_access_token(token) if scheme.lower() == "bearer" else None
+                if payload is not None and payload.get("uid") is not None:
+                    return f"user:{payload['uid']}"
+                break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware that sheds load on expensive routes before they reach the app.
+
+    A request matching a policy first takes a token from its rate limit bucket (429 when
+    empty) and then a concurrency slot, waiting at most the queue timeout (503 when none
+    frees up). Both carry ``Retry-After``. Routes without a policy pass straight through,
+    so cheap reads keep their latency while an expensive route is saturated.
+    """
+
+    def __init__(self, app, policies: Optional[List[AdmissionPolicy]] = None, backend=None):
+        self.app = app
+        self.policies = admission_policies if policies is None else policies
+        self.backend = create_rate_limit_backend() if backend is None else backend
+        self._routes = {route: policy for policy in self.policies for route in policy.routes}
+
+    async def __call__(self, scope, receive, send):
+        policy = self._routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        if policy.rate is not None:
+            retry_after = await self.backend.take(f"{policy.name}:{_rate_key(scope, policy.rate_key)}", *policy.rate)
+            if retry_after > 0:
+                ADMISSION_REJECTED.inc(policy=policy.name, reason="rate")
+                await self._reject(scope, receive, send, 429, "Too many requests", retry_after)
+                return
+        if policy.concurrency is None:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        if not await policy.concurrency.acquire():
+            ADMISSION_REJECTED.inc(policy=policy.name, reason="queue_timeout")
+            await self._reject(scope, receive, send, 503, "Server is busy", policy.concurrency.timeout)
+            return
+        ADMISSION_QUEUE_SECONDS.observe(time.perf_counter() - start, policy=policy.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            policy.concurrency.release()
+
+    async def _reject(self, scope, receive, send, status: int, detail: str, retry_after: float):
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+        await JSONResponse({"detail": detail}, status_code=status, headers=headers)(scope, receive, send)
+
+admission_policies = default_policies()
+
+def _concurrency_gauge(attribute: str):
+    def samples():
+        for policy in admission_policies:
+            if policy.concurrency is not None:
+                yield (policy.name,), getattr(policy.concurrency, attribute)
+    return samples
+
+registry.gauge("admission_in_flight", "Requests holding a concurrency slot.", ["policy"], _concurrency_gauge("in_flight"))
+registry.gauge("admission_waiting", "Requests queued for a concurrency slot.", ["policy"], _concurrency_gauge("waiting"))
@@ -0,0 +1,94 @@
+"""Moves old finished tasks from ``tasks`` to ``tasks_archive``.
+
+Run it periodically, e.g. from cron: ``python -m app.services.archive``. Each batch is
+one transaction that copies the rows, deletes them from ``tasks`` and bumps the owners'
+tasks versions, so list caches and ETags move on and task streams see the rows leave.
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import DateTime, delete, insert, literal, text
+from sqlalchemy.future import select
+from ..config import TASKS_ARCHIVE_AFTER_DAYS, TASKS_ARCHIVE_BATCH, TASKS_ARCHIVE_STATUS
+from ..database import AsyncSessionLocal
+from ..models.task import Task, TaskArchive
+from .change_version import bump_tasks_version, publish_tasks_changed
+from .metrics import registry
+from .search import search_backend
+
+ARCHIVED_TASKS = registry.counter("tasks_archived_total", "Tasks moved from tasks to tasks_archive.")
+
+def partition_name(year: int) -> str:
+    return f"tasks_archive_y{year}"
+
+async def ensure_partitions(db, years: Iterable[int]):
+    """Create the yearly tasks_archive partitions the next rows need (PostgreSQL only)."""
+    if (await db.connection()).dialect.name != "postgresql":
+        return
+    for year in sorted(set(years)):
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF tasks_archive "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+
+async def archive_tasks(older_than: timedelta = timedelta(days=TASKS_ARCHIVE_AFTER_DAYS),
+                        status: str = TASKS_ARCHIVE_STATUS, batch_size: int = TASKS_ARCHIVE_BATCH,
+                        now: Optional[datetime] = None, session_factory=AsyncSessionLocal) -> int:
+    """Archive tasks in ``status`` created before ``now - older_than``; return how many moved."""
+    now = datetime.utcnow() if now is None else now
+    cutoff = now - older_than
+    columns = [column.key for column in Task.__table__.c]
+    moved = 0
+    while True:
+        async with session_factory() as db:
+            # SKIP LOCKED lets two overlapping runs split the work instead of queueing on each other
+            candidates = (await db.execute(
+                select(Task.id, Task.owner_id, Task.created_at)
+                .filter(Task.status == status, Task.created_at < cutoff)
+                .order_by(Task.id).limit(batch_size).with_for_update(skip_locked=True)
+            )).all()
+            if not candidates:
+                break
+            task_ids = [row.id for row in candidates]
+            await ensure_partitions(db, (row.created_at.year for row in candidates))
+            rows = select(*Task.__table__.c, literal(now, DateTime)).filter(Task.id.in_(task_ids))
+            await db.execute(insert(TaskArchive).from_select(columns + ["archived_at"], rows))
+            await db.execute(delete(Task).filter(Task.id.in_(task_ids)))
+            by_owner = defaultdict(list)
+            for row in candidates:
+                by_owner[row.owner_id].append(row.id)
+            versions = {owner_id: await bump_tasks_version(db, owner_id) for owner_id in sorted(by_owner)}
+            await db.commit()
+        for task_id in task_ids:
+            search_backend.remove(task_id)
+        for owner_id, owner_task_ids in by_owner.items():
+            publish_tasks_changed(owner_id, versions[owner_id], [], owner_task_ids)
+        ARCHIVED_TASKS.inc(len(task_ids))
+        moved += len(task_ids)
+        if len(candidates) < batch_size:
+            break
+    return moved
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.services.archive")
+    parser.add_argument("--older-than-days", type=int, default=TASKS_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--status", default=TASKS_ARCHIVE_STATUS)
+    parser.add_argument("--batch-size", type=int, default=TASKS_ARCHIVE_BATCH)
+    args = parser.parse_args(argv)
+
+    from ..database import engine
+    from .invalidation import invalidation_bus
+    await invalidation_bus.start()
+    try:
+        moved = await archive_tasks(timedelta(days=args.older_than_days), args.status, args.batch_size)
+        # the workers' in-memory search indexes learn about the removed rows from the bus
+        await invalidation_bus.drain()
+        print(f"archived {moved} tasks")
+    finally:
+        await invalidation_bus.stop()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
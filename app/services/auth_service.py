@@ -1,9 +1,32 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from ..config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from ..config import TOKEN_CACHE_SIZE, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, BCRYPT_ROUNDS
+from .cache import LRUCache
+from .invalidation import invalidation_bus
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds and max_rounds pin the cost, so verify_and_update flags any hash made with a different cost factor
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS, bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# Decoded tokens live until their own "exp"; principals for PRINCIPAL_CACHE_TTL seconds
+token_cache = LRUCache(TOKEN_CACHE_SIZE)
+principal_cache = LRUCache(PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as seen by request handlers, detached from any session."""
+    id: int
+    email: str
+    name: str
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(id=user.id, email=user.email, name=user.name)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
@@ -11,6 +34,9 @@ def get_password_hash(password):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password, hashed_password):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -28,4 +54,33 @@ def verify_token(token: str):
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+def decode_access_token(token: str):
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = verify_token(token)
+    if payload is not None and "exp" in payload:
+        token_cache.set(token, payload, expires_at=payload["exp"])
+    return payload
+
+def get_cached_principal(user_id: int):
+    return principal_cache.get(user_id)
+
+def cache_principal(user) -> Principal:
+    principal = Principal.from_user(user)
+    principal_cache.set(principal.id, principal)
+    return principal
+
+def invalidate_user(user_id: int):
+    """Drop the cached principal in every worker; call whenever a user row is changed or deleted."""
+    invalidation_bus.publish("user", {"id": user_id})
+
+def _drop_principal(payload):
+    if payload is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(payload["id"])
+
+invalidation_bus.subscribe("user", _drop_principal)
@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ..config import TASK_LIST_CACHE_SIZE
+from ..models.user import User
+from .cache import LRUCache
+from .invalidation import invalidation_bus
+from .task_events import changes_frame, task_event_hub
+
+# Rendered list bodies keyed by (user id, path, query params, tasks version); a bump makes old keys unreachable,
+# so the cache stays coherent across workers without invalidation messages
+task_list_cache = LRUCache(TASK_LIST_CACHE_SIZE)
+
+async def get_tasks_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    return await db.scalar(select(User.tasks_version).filter(User.id == user_id))
+
+async def bump_tasks_version(db: AsyncSession, user_id: int) -> int:
+    """Increment the user's tasks version inside the caller's write transaction."""
+    query = update(User).filter(User.id == user_id).values(tasks_version=User.tasks_version + 1)
+    return await db.scalar(query.returning(User.tasks_version))
+
+def publish_tasks_changed(owner_id: int, version: int, tasks, deleted_ids=()):
+    """Announce a committed write to this worker's task streams and to the other workers.
+
+    ``version`` is the tasks version the write produced; ``tasks`` are the written rows.
+    """
+    task_event_hub.publish(owner_id, version, changes_frame(version, tasks, deleted_ids))
+    task_ids = sorted({task.id for task in tasks} | set(deleted_ids))
+    invalidation_bus.publish("tasks", {"owner_id": owner_id, "ids": task_ids, "version": version, "deleted": sorted(deleted_ids)})
@@ -0,0 +1,29 @@
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+def task_etag(version: int) -> str:
+    return f'"v{version}"'
+
+def parse_if_match(header: str) -> Optional[List[int]]:
+    """Return the task versions listed in an If-Match header, or None for "*"."""
+    if header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith('"v') and tag.endswith('"') and tag[2:-1].isdigit():
+            versions.append(int(tag[2:-1]))
+    return versions
+
+def list_etag(user_id: int, version: int, params: Iterable[Tuple[str, str]]) -> str:
+    """ETag of a list response; the user id is hashed in so users at the same version never share a tag."""
+    digest = hashlib.sha1(repr((user_id, tuple(params))).encode()).hexdigest()[:16]
+    return f'"t{version}-{digest}"'
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header matches etag (weak comparison, as RFC 9110 requires)."""
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
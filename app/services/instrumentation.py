@@ -0,0 +1,145 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from ..config import SLOW_QUERY_MS
+from .metrics import registry
+
+logger = logging.getLogger("app.db")
+
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "Time spent executing SQL statements.", ["operation"]
+)
+DB_SLOW_QUERIES = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.", ["operation"]
+)
+DB_POOL_WAIT_SECONDS = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Pool checkouts that failed while waiting for a connection."
+)
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests handled.", ["method", "route", "status"]
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ["method", "route"]
+)
+HTTP_REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+HTTP_REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ["method", "route"]
+)
+
+
+class RequestDBStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+def current_request_stats() -> Optional[RequestDBStats]:
+    return _request_stats.get()
+
+def _operation(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    operation = _operation(statement)
+    DB_QUERY_SECONDS.observe(elapsed, operation=operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc(operation=operation)
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:1000])
+
+def _handle_error(context):
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+def instrument_engine(engine):
+    """Attach query timing listeners to an AsyncEngine (or a sync Engine)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except Exception:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    def capacity(self) -> int:
+        return self.size() + max(self.max_overflow, 0)
+
+def pool_gauges(engine):
+    def checked_out():
+        yield (), engine.sync_engine.pool.checkedout()
+
+    def saturation():
+        pool = engine.sync_engine.pool
+        if isinstance(pool, InstrumentedQueuePool) and pool.capacity() > 0:
+            yield (), pool.checkedout() / pool.capacity()
+
+    registry.gauge("db_pool_checked_out", "Connections currently checked out of the pool.", callback=checked_out)
+    registry.gauge("db_pool_saturation", "Checked-out connections as a fraction of pool capacity.", callback=saturation)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware collecting per-request latency, SQL count and SQL time."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestDBStats()
+        token = _request_stats.set(stats)
+        status_holder = {"status": 500}
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": route.path if route is not None else "unmatched"}
+            HTTP_REQUESTS.inc(status=status_holder["status"], **labels)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, **labels)
+            HTTP_REQUEST_QUERIES.observe(stats.queries, **labels)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.db_time, **labels)
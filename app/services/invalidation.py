@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from contextlib import suppress
+from typing import Callable, Optional
+from sqlalchemy.engine import make_url
+from ..config import DATABASE_URL, INVALIDATION_BUS, INVALIDATION_CHANNEL
+
+logger = logging.getLogger("app.invalidation")
+
+# NOTIFY payloads are limited to 8000 bytes; larger messages degrade to a topic-wide reset
+MAX_NOTIFY_BYTES = 7900
+
+Handler = Callable[[Optional[dict]], None]
+
+class LocalInvalidationBus:
+    """Delivers invalidation messages to handlers in this process only.
+
+    Enough for a single worker and for tests. A handler receives the published payload,
+    or ``None`` when everything it caches must be dropped.
+    """
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Handler, remote_only: bool = False):
+        """Register a handler; ``remote_only`` handlers skip messages published by this worker."""
+        self._handlers[topic].append((handler, remote_only))
+
+    def publish(self, topic: str, payload: dict):
+        self.dispatch(topic, payload, remote=False)
+
+    def dispatch(self, topic: str, payload: Optional[dict], remote: bool):
+        for handler, remote_only in self._handlers[topic]:
+            if remote_only and not remote:
+                continue
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", topic)
+
+    def reset(self):
+        for topic in list(self._handlers):
+            self.dispatch(topic, None, remote=True)
+
+    async def start(self):
+        pass
+
+    async def drain(self, timeout: float = 5.0):
+        """Wait until published messages have left this process; a no-op for in-process delivery."""
+
+    async def stop(self):
+        pass
+
+
+class PostgresInvalidationBus(LocalInvalidationBus):
+    """Fans messages out to every worker through Postgres ``LISTEN/NOTIFY``.
+
+    Each worker keeps one dedicated connection that listens on the channel and sends
+    queued messages, so ``publish`` never waits on the network. Notifications sent while
+    the connection is down are lost, so every (re)connect resets all handlers.
+    """
+
+    def __init__(self, dsn: str, channel: str = INVALIDATION_CHANNEL, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.origin = uuid.uuid4().hex
+        self._outbox: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, topic: str, payload: dict):
+        super().publish(topic, payload)
+        if self._outbox is not None:
+            self._outbox.put_nowait(self.encode(topic, payload))
+
+    def encode(self, topic: str, payload: Optional[dict]) -> str:
+        message = json.dumps({"o": self.origin, "t": topic, "p": payload}, separators=(",", ":"))
+        if len(message.encode()) > MAX_NOTIFY_BYTES:
+            return self.encode(topic, None)
+        return message
+
+    def _on_notify(self, connection, pid, channel, message):
+        try:
+            message = json.loads(message)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation message on %s", channel)
+            return
+        if message.get("o") != self.origin:
+            self.dispatch(message["t"], message.get("p"), remote=True)
+
+    async def start(self):
+        if self._task is None:
+            self._outbox = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def drain(self, timeout: float = 5.0):
+        if self._outbox is not None:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._outbox.join(), timeout)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = self._outbox = None
+
+    async def _run(self):
+        import asyncpg
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Invalidation bus cannot connect: %s", exc)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            try:
+                await self._serve(connection)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Invalidation bus connection lost: %s", exc)
+            finally:
+                with suppress(Exception):
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _serve(self, connection):
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        await connection.add_listener(self.channel, self._on_notify)
+        self.reset()
+        lost_wait = asyncio.ensure_future(lost.wait())
+        receive = None
+        try:
+            while True:
+                receive = asyncio.ensure_future(self._outbox.get())
+                await asyncio.wait({receive, lost_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if not receive.done():
+                    receive.cancel()
+                    return
+                message = receive.result()
+                try:
+                    await connection.execute("SELECT pg_notify($1, $2)", self.channel, message)
+                except BaseException:
+                    self._outbox.put_nowait(message)
+                    raise
+                finally:
+                    self._outbox.task_done()
+        finally:
+            lost_wait.cancel()
+            if receive is not None and not receive.done():
+                receive.cancel()
+
+
+def resolve_bus_backend(name: str = INVALIDATION_BUS, url: str = DATABASE_URL) -> str:
+    if name == "auto":
+        return "postgres" if make_url(url).get_backend_name() == "postgresql" else "local"
+    if name not in ("postgres", "local"):
+        raise ValueError(f"Unknown invalidation bus: {name}")
+    return name
+
+def create_invalidation_bus(name: str = INVALIDATION_BUS, url: str = DATABASE_URL):
+    if resolve_bus_backend(name, url) == "postgres":
+        dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresInvalidationBus(dsn)
+    return LocalInvalidationBus()
+
+invalidation_bus = create_invalidation_bus()
@@ -0,0 +1,89 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, tuple_, union_all
+from ..models.task import Task
+
+ORDERINGS = {
+    "created_at": Task.created_at,
+    "priority": Task.priority,
+}
+ORDER_BY_CHOICES = sorted(list(ORDERINGS) + ["-" + key for key in ORDERINGS])
+
+def _split_order(order_by: str):
+    descending = order_by.startswith("-")
+    return ORDERINGS[order_by.lstrip("-")], descending
+
+def make_cursor(order_by: str, value, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"o": order_by, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def encode_cursor(order_by: str, task) -> str:
+    column, _ = _split_order(order_by)
+    return make_cursor(order_by, getattr(task, column.key), task.id)
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def decode_cursor(cursor: str, order_by: str) -> Optional[dict]:
+    """Decode a cursor made for ``order_by``; None if it is malformed or its value has the wrong type."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["o"] != order_by or not _is_int(data["id"]):
+            return None
+        key, value = order_by.lstrip("-"), data["v"]
+        # a null value would make the row-value comparison never true and silently end the listing
+        if value is None:
+            return None
+        if key == "created_at":
+            data["v"] = datetime.fromisoformat(value)
+        elif key == "priority" and not _is_int(value):
+            return None
+        elif key == "rank" and not (isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)):
+            return None
+        return data
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def paginate(query, order_by: str, cursor: Optional[dict], limit: int, columns=None):
+    """Apply keyset ordering on (column, id) and fetch one extra row to detect the next page.
+
+    ``columns`` is the column collection to order by, for queries that do not select from ``tasks``.
+    """
+    column, descending = _split_order(order_by)
+    columns = Task.__table__.c if columns is None else columns
+    column, id_column = columns[column.key], columns.id
+    if cursor is not None:
+        # a row-value comparison lets the (owner_id, column, id) indexes seek straight to the cursor
+        position, after = tuple_(column, id_column), tuple_(cursor["v"], cursor["id"])
+        query = query.filter(position < after if descending else position > after)
+    if descending:
+        query = query.order_by(column.desc(), id_column.desc())
+    else:
+        query = query.order_by(column.asc(), id_column.asc())
+    return query.limit(limit + 1)
+
+def paginate_union(queries, order_by: str, cursor: Optional[dict], limit: int):
+    """One keyset page over several queries with the same columns, e.g. ``tasks`` and ``tasks_archive``.
+
+    Each branch is paginated on its own, so it still seeks through its own index and
+    reads at most one page; only those rows are merged and cut to the page.
+    """
+    branches = [
+        select(paginate(query, order_by, cursor, limit, query.selected_columns).subquery())
+        for query in queries
+    ]
+    merged = union_all(*branches).subquery()
+    return paginate(select(merged), order_by, None, limit, merged.c)
+
+def split_page(rows, order_by: str, limit: int):
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(order_by, rows[-1])
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+from ..config import PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE
+from .auth_service import get_password_hash, verify_and_update_password
+from .metrics import registry
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HASH_SECONDS = registry.histogram(
+    "password_hash_duration_seconds", "Queue wait plus bcrypt time per hash or verify call.", buckets=LATENCY_BUCKETS
+)
+HASH_REJECTED = registry.counter("password_hash_rejected_total", "Hash calls rejected because the queue was full.")
+
+class HashQueueFull(Exception):
+    pass
+
+class PasswordHasher:
+    """Runs bcrypt in a worker pool so hashing never blocks the event loop.
+
+    At most ``workers + queue_size`` calls may be pending; further calls raise
+    HashQueueFull immediately instead of queueing without bound.
+    """
+
+    def __init__(self, kind: str = PASSWORD_HASH_EXECUTOR, workers: int = PASSWORD_HASH_WORKERS,
+                 queue_size: int = PASSWORD_HASH_QUEUE_SIZE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            pool = ThreadPoolExecutor if self.kind == "thread" else ProcessPoolExecutor
+            self._executor = pool(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            HASH_REJECTED.inc()
+            raise HashQueueFull()
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            HASH_SECONDS.observe(time.perf_counter() - start)
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; the second item is a fresh hash when the stored one uses an outdated cost."""
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        """Queue state of this hasher; latency is in the password_hash_duration_seconds histogram."""
+        return {
+            "queue_depth": max(0, self.pending - self.workers),
+            "in_flight": min(self.pending, self.workers),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher()
+
+def _queue_gauges():
+    stats = password_hasher.stats()
+    yield ("queued",), stats["queue_depth"]
+    yield ("running",), stats["in_flight"]
+
+registry.gauge("password_hash_pending", "Hash calls waiting for or running in the worker pool.", ["state"], _queue_gauges)
@@ -0,0 +1,250 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from hmac import compare_digest
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+from ..config import (
+    ADMIN_TOKEN, PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_KEEP, PROFILE_SAMPLE_RATE, SERVER_TIMING, SLOW_REQUESTS_KEEP,
+)
+from .instrumentation import RequestDBStats, current_request_stats
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# query parameters whose names contain these are logged without their values (e.g. /auth/refresh?refresh_token=)
+SECRET_PARAM_MARKERS = ("token", "password", "secret")
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+@contextmanager
+def timed(phase: str):
+    """Add the wall time of the block to ``phase`` of the current request's Server-Timing breakdown."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+_switch_lock = threading.Lock()
+_active_samplers = 0
+_saved_switch_interval = None
+
+def _shorten_switch_interval(interval: float):
+    # the sampler thread only gets the GIL once per switch interval (5 ms by default)
+    global _active_samplers, _saved_switch_interval
+    with _switch_lock:
+        if _active_samplers == 0:
+            _saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(_saved_switch_interval, interval))
+        _active_samplers += 1
+
+def _restore_switch_interval():
+    global _active_samplers
+    with _switch_lock:
+        _active_samplers -= 1
+        if _active_samplers == 0:
+            sys.setswitchinterval(_saved_switch_interval)
+
+
+class StackSampler:
+    """Samples the event loop thread while one request's coroutine is on its stack.
+
+    A sample counts only if the request's own frame is among the active frames, so time
+    the loop spends on other requests is left out. Stacks are cut at that frame and kept
+    as folded ``caller;callee count`` lines, the input format of flamegraph.pl and speedscope.
+    The interpreter switch interval is shortened while any sampler runs.
+    """
+
+    def __init__(self, root_frame, interval: float):
+        self.root = root_frame
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        _shorten_switch_interval(self.interval)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        _restore_switch_interval()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and frame is not self.root:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if frame is self.root and names and not self._stop.is_set():
+                self.stacks[";".join(reversed(names))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SlowRequestLog:
+    """The ``size`` slowest requests seen by this worker, with their phase breakdowns."""
+
+    def __init__(self, size: int = SLOW_REQUESTS_KEEP):
+        self.size = size
+        self._heap = []
+        self._counter = itertools.count()
+
+    def add(self, duration: float, entry: dict):
+        item = (duration, next(self._counter), entry)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        elif duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def threshold(self) -> float:
+        return self._heap[0][0] if len(self._heap) >= self.size else 0.0
+
+    def entries(self) -> List[dict]:
+        return [entry for _, _, entry in sorted(self._heap, key=lambda item: item[0], reverse=True)]
+
+    def clear(self):
+        self._heap.clear()
+
+slow_requests = SlowRequestLog()
+
+def _server_timing(timings: Dict[str, float], stats: Optional[RequestDBStats], total: float) -> str:
+    parts = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+    if stats is not None:
+        parts.append(f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"')
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+def save_profile(profile_id: str, folded: str, keep: int = PROFILE_KEEP):
+    """Write a profile to PROFILE_DIR and delete the oldest ones beyond ``keep``; blocking, run it in a thread."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.folded"), "w") as file:
+        file.write(folded)
+    with os.scandir(PROFILE_DIR) as entries:
+        profiles = [entry for entry in entries if entry.name.endswith(".folded") and entry.is_file()]
+    if len(profiles) > keep:
+        profiles.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in profiles[:len(profiles) - keep]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+def redact_query(query_string: bytes) -> str:
+    params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    return urlencode([
+        (name, "[redacted]" if any(marker in name.lower() for marker in SECRET_PARAM_MARKERS) else value)
+        for name, value in params
+    ], safe="[]")
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not profile_id.replace("-", "").isalnum():
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware adding ``Server-Timing``, the slow request log and on-demand profiles.
+
+    Phases are recorded with ``timed()`` anywhere in the request; SQL time and statement
+    count come from RequestMetricsMiddleware, so this middleware must run inside it. A
+    request is profiled when it carries ``X-Profile: <ADMIN_TOKEN>`` or is picked by
+    PROFILE_SAMPLE_RATE; the folded stacks are written to PROFILE_DIR and the response
+    names the file in ``X-Profile-Id``.
+
+    Streamed responses (no Content-Length) enter the slow request log with their time to
+    the first byte, since their total time depends on the client; event streams stay out.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+
+    def _wants_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                return is_admin_token(value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = {}
+        token = _timings.set(timings)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        profile_id = None
+        sampler = None
+        if self._wants_profile(scope):
+            profile_id = f"{started_at:%Y%m%dT%H%M%S}-{os.getpid()}-{random.getrandbits(32):08x}"
+            sampler = StackSampler(sys._getframe(), self.interval)
+            sampler.start()
+        response = {"status": 500, "started": None, "streamed": False, "event_stream": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                names = {name.lower(): value for name, value in headers}
+                response.update(
+                    status=message["status"], started=time.perf_counter(),
+                    streamed=b"content-length" not in names and message["status"] not in (204, 304),
+                    event_stream=names.get(b"content-type", b"").startswith(b"text/event-stream"),
+                )
+                if SERVER_TIMING:
+                    value = _server_timing(timings, current_request_stats(), time.perf_counter() - start)
+                    headers.append((b"server-timing", value.encode()))
+                if profile_id is not None:
+                    headers.append((PROFILE_ID_HEADER.lower().encode(), profile_id.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+            duration = time.perf_counter() - start
+            if response["streamed"]:
+                duration = response["started"] - start
+            if sampler is not None:
+                sampler.stop()
+                await asyncio.to_thread(save_profile, profile_id, sampler.folded())
+            if not response["event_stream"] and duration > slow_requests.threshold():
+                stats = current_request_stats()
+                slow_requests.add(duration, {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": redact_query(scope.get("query_string", b"")),
+                    "status": response["status"],
+                    "duration_ms": round(duration * 1000, 2),
+                    "streamed": response["streamed"],
+                    "phases_ms": {phase: round(seconds * 1000, 2) for phase, seconds in timings.items()},
+                    "db_ms": round(stats.db_time * 1000, 2) if stats is not None else None,
+                    "queries": stats.queries if stats is not None else None,
+                    "started_at": started_at.isoformat(),
+                    "profile_id": profile_id,
+                })
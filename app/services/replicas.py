@@ -0,0 +1,84 @@
+import time
+from contextlib import asynccontextmanager
+from http.cookies import SimpleCookie
+from typing import List
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+STICKY_COOKIE = "read_primary_until"
+CONSISTENCY_HEADER = "x-read-consistency"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+class ReplicaRouter:
+    """Round-robin over read replicas, skipping any that failed to connect recently."""
+
+    def __init__(self, engines: List[AsyncEngine], retry_after: float):
+        self.engines = list(engines)
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(self.engines)
+        self._next = 0
+
+    def candidates(self) -> List[AsyncEngine]:
+        now = time.monotonic()
+        count = len(self.engines)
+        start, self._next = self._next, (self._next + 1) % count if count else 0
+        order = [(start + offset) % count for offset in range(count)]
+        return [self.engines[index] for index in order if self._down_until[index] <= now]
+
+    def mark_down(self, engine: AsyncEngine):
+        self._down_until[self.engines.index(engine)] = time.monotonic() + self.retry_after
+
+    def healthy(self) -> List[AsyncEngine]:
+        now = time.monotonic()
+        return [engine for engine, down_until in zip(self.engines, self._down_until) if down_until <= now]
+
+    @asynccontextmanager
+    async def session(self, primary_factory, sticky: bool = False):
+        """Yield a session on a healthy replica, or on the primary when sticky or none is reachable."""
+        if not sticky:
+            for engine in self.candidates():
+                session = AsyncSession(bind=engine, expire_on_commit=False)
+                try:
+                    await session.connection()
+                except (DBAPIError, OSError):
+                    await session.close()
+                    self.mark_down(engine)
+                    continue
+                async with session:
+                    yield session
+                return
+        async with primary_factory() as session:
+            yield session
+
+def wants_primary(headers, cookies) -> bool:
+    if headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    try:
+        return float(cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """After a successful write, pin the client's reads to the primary for a short window."""
+
+    def __init__(self, app, window: int):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[STICKY_COOKIE] = str(int(time.time()) + self.window)
+                cookie[STICKY_COOKIE].update({"max-age": self.window, "path": "/", "httponly": True, "samesite": "Lax"})
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.output(header="").strip().encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
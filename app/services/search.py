@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import html
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, cast, func, literal_column, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ..config import SEARCH_BACKEND, SEARCH_TS_CONFIG
+from ..database import AsyncSessionLocal, engine
+from ..models.task import Task
+from .invalidation import invalidation_bus
+from .pagination import ORDER_BY_CHOICES, ORDERINGS, make_cursor, paginate
+from .serialization import task_row
+
+SEARCH_ORDER_BY_CHOICES = ["rank"] + ORDER_BY_CHOICES
+TITLE_WEIGHT = 2.0
+SNIPPET_RADIUS = 80
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+def highlight(text: Optional[str], terms: List[str], radius: Optional[int] = None) -> Optional[str]:
+    """HTML-escape text and wrap words starting with any of the terms in <mark>."""
+    if not text or not terms:
+        return html.escape(text) if text else text
+    alternatives = "|".join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+    pattern = re.compile(r"(?<!\w)(?:%s)\w*" % alternatives, re.IGNORECASE)
+    matches = list(pattern.finditer(text))
+    start, end = 0, len(text)
+    if radius is not None and matches and len(text) > 2 * radius:
+        start = max(0, matches[0].start() - radius)
+        end = min(len(text), matches[0].end() + radius)
+    parts, position = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append("<mark>%s</mark>" % html.escape(match.group()))
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet = snippet + "…"
+    return snippet
+
+def build_hit(task, rank: float, terms: List[str]) -> dict:
+    hit = task_row(task)
+    hit["rank"] = rank
+    hit["highlights"] = {
+        "title": highlight(task.title, terms),
+        "description": highlight(task.description, terms, SNIPPET_RADIUS),
+    }
+    return hit
+
+def split_hits(rows: List[Tuple[Task, float]], order_by: str, limit: int):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    task, rank = rows[-1]
+    value = rank if order_by == "rank" else getattr(task, ORDERINGS[order_by.lstrip("-")].key)
+    return rows, make_cursor(order_by, value, task.id)
+
+
+class PostgresSearchBackend:
+    """Full-text search over the generated tasks.search_vector column and its GIN index.
+
+    The column is computed by PostgreSQL itself, so writes need no extra indexing step.
+    """
+
+    def index(self, task):
+        pass
+
+    def remove(self, task_id: int):
+        pass
+
+    async def rebuild(self):
+        pass
+
+    async def search(self, db: AsyncSession, owner_id: int, q: str, order_by: str, cursor: Optional[dict], limit: int):
+        from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+
+        terms = tokenize(q)
+        if not terms:
+            return []
+        tsquery = func.to_tsquery(cast(SEARCH_TS_CONFIG, REGCONFIG), " & ".join(term + ":*" for term in terms))
+        vector = literal_column("tasks.search_vector", type_=TSVECTOR)
+        rank = func.ts_rank_cd(vector, tsquery, 32)
+        query = select(Task, rank.label("rank")).filter(Task.owner_id == owner_id, vector.op("@@")(tsquery))
+        if order_by == "rank":
+            if cursor is not None:
+                query = query.filter(or_(rank < cursor["v"], and_(rank == cursor["v"], Task.id > cursor["id"])))
+            query = query.order_by(rank.desc(), Task.id.asc()).limit(limit + 1)
+        else:
+            query = paginate(query, order_by, cursor, limit)
+        result = await db.execute(query)
+        return [(row.Task, row.rank) for row in result]
+
+
+class InMemorySearchBackend:
+    """Per-owner inverted index held in process memory, for SQLite and test deployments.
+
+    Titles are weighted above descriptions, terms are scored by tf-idf and every query
+    token is matched as a prefix against a sorted vocabulary.
+    """
+
+    def __init__(self):
+        self._reset()
+        self._built = False
+        self._build_lock = asyncio.Lock()
+        self._stale = set()
+
+    def _reset(self):
+        self._docs = {}
+        self._postings = defaultdict(dict)
+        self._vocab = defaultdict(list)
+        self._doc_counts = Counter()
+
+    def index(self, task):
+        self.remove(task.id)
+        weights = Counter()
+        for token in tokenize(task.title):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(task.description):
+            weights[token] += 1.0
+        owner_id = task.owner_id
+        postings, vocab = self._postings[owner_id], self._vocab[owner_id]
+        for term, weight in weights.items():
+            if term not in postings:
+                postings[term] = {}
+                insort(vocab, term)
+            postings[term][task.id] = weight
+        self._docs[task.id] = (owner_id, list(weights), task.created_at, task.priority)
+        self._doc_counts[owner_id] += 1
+
+    def remove(self, task_id: int):
+        doc = self._docs.pop(task_id, None)
+        if doc is None:
+            return
+        owner_id, terms = doc[0], doc[1]
+        postings, vocab = self._postings[owner_id], self._vocab[owner_id]
+        for term in terms:
+            postings[term].pop(task_id, None)
+            if not postings[term]:
+                del postings[term]
+                del vocab[bisect_left(vocab, term)]
+        self._doc_counts[owner_id] -= 1
+
+    def invalidate(self, payload: Optional[dict]):
+        """Mark tasks changed by another worker for re-reading on the next search; ``None`` drops the index."""
+        if payload is None:
+            self._built = False
+        else:
+            self._stale.update(payload["ids"])
+
+    async def _refresh(self):
+        task_ids, self._stale = self._stale, set()
+        columns = (Task.id, Task.owner_id, Task.title, Task.description, Task.created_at, Task.priority)
+        async with AsyncSessionLocal() as db:
+            rows = {row.id: row for row in await db.execute(select(*columns).filter(Task.id.in_(task_ids)))}
+        for task_id in task_ids:
+            if task_id in rows:
+                self.index(rows[task_id])
+            else:
+                self.remove(task_id)
+
+    async def rebuild(self):
+        self._stale.clear()
+        self._reset()
+        columns = (Task.id, Task.owner_id, Task.title, Task.description, Task.created_at, Task.priority)
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(select(*columns).execution_options(yield_per=1000))
+            async for row in result:
+                self.index(row)
+        self._built = True
+
+    async def _ensure_built(self):
+        # built on first search rather than at startup, so new workers start without reading every task
+        if self._built and not self._stale:
+            return
+        async with self._build_lock:
+            if not self._built:
+                await self.rebuild()
+            elif self._stale:
+                await self._refresh()
+
+    def _expand(self, owner_id: int, prefix: str):
+        vocab = self._vocab[owner_id]
+        position = bisect_left(vocab, prefix)
+        while position < len(vocab) and vocab[position].startswith(prefix):
+            yield vocab[position]
+            position += 1
+
+    def _match(self, owner_id: int, terms: List[str]) -> dict:
+        postings, total = self._postings[owner_id], self._doc_counts[owner_id]
+        scores = None
+        for prefix in set(terms):
+            term_scores = defaultdict(float)
+            for term in self._expand(owner_id, prefix):
+                idf = math.log(1 + total / len(postings[term]))
+                for task_id, weight in postings[term].items():
+                    term_scores[task_id] += weight * idf
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {task_id: score + term_scores[task_id] for task_id, score in scores.items() if task_id in term_scores}
+            if not scores:
+                return {}
+        return scores
+
+    async def search(self, db: AsyncSession, owner_id: int, q: str, order_by: str, cursor: Optional[dict], limit: int):
+        terms = tokenize(q)
+        if not terms:
+            return []
+        await self._ensure_built()
+        scores = self._match(owner_id, terms)
+        if order_by == "rank":
+            keys = {task_id: (-score, task_id) for task_id, score in scores.items()}
+            after = (-cursor["v"], cursor["id"]) if cursor is not None else None
+        else:
+            field = 2 if order_by.lstrip("-") == "created_at" else 3
+            keys = {task_id: (self._docs[task_id][field], task_id) for task_id in scores}
+            after = (cursor["v"], cursor["id"]) if cursor is not None else None
+        reverse = order_by.startswith("-")
+        candidates = keys.items()
+        if after is not None:
+            candidates = [(task_id, key) for task_id, key in candidates if (key < after if reverse else key > after)]
+        pick = heapq.nlargest if reverse else heapq.nsmallest
+        page_ids = [task_id for task_id, _ in pick(limit + 1, candidates, key=lambda item: item[1])]
+        if not page_ids:
+            return []
+        result = await db.execute(select(Task).filter(Task.id.in_(page_ids), Task.owner_id == owner_id))
+        tasks = {task.id: task for task in result.scalars()}
+        return [(tasks[task_id], scores[task_id]) for task_id in page_ids if task_id in tasks]
+
+
+def create_search_backend(name: str = SEARCH_BACKEND):
+    if name == "auto":
+        name = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    if name == "postgres":
+        return PostgresSearchBackend()
+    if name == "memory":
+        return InMemorySearchBackend()
+    raise ValueError(f"Unknown search backend: {name}")
+
+search_backend = create_search_backend()
+if isinstance(search_backend, InMemorySearchBackend):
+    # this worker indexes its own writes directly; only changes made elsewhere need re-reading
+    invalidation_bus.subscribe("tasks", search_backend.invalidate, remote_only=True)
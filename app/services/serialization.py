@@ -0,0 +1,45 @@
+import json
+from datetime import date, datetime
+from typing import Iterable, Iterator, Optional
+from ..schemas.task import TaskOut
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is the fallback
+    orjson = None
+
+TASK_FIELDS = tuple(TaskOut.model_fields)
+STREAM_CHUNK_SIZE = 100
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def task_row(row) -> dict:
+    """Plain dict with exactly the TaskOut fields, from a Core row, mapping or ORM object."""
+    mapping = getattr(row, "_mapping", None)
+    if mapping is not None:
+        return {field: mapping[field] for field in TASK_FIELDS}
+    return {field: getattr(row, field) for field in TASK_FIELDS}
+
+def render_page(items: Iterable[dict], next_cursor: Optional[str]) -> bytes:
+    return dumps({"items": list(items), "next_cursor": next_cursor})
+
+def iter_page(items: Iterable[dict], next_cursor: Optional[str], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the same document as render_page, encoding chunk_size items at a time."""
+    yield b'{"items":['
+    chunk, first = [], True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield (b"" if first else b",") + dumps(chunk)[1:-1]
+            chunk, first = [], False
+    if chunk:
+        yield (b"" if first else b",") + dumps(chunk)[1:-1]
+    yield b'],"next_cursor":' + dumps(next_cursor) + b"}"
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from typing import List
+from sqlalchemy import bindparam, delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ..models.task import Task
+from .change_version import bump_tasks_version, publish_tasks_changed
+from .search import search_backend
+
+async def execute_batch(db: AsyncSession, owner_id: int, operations: List) -> List[dict]:
+    """Apply create/update/delete operations for one owner in a single transaction.
+
+    Operations are grouped by kind and run as one multi-row INSERT ... RETURNING,
+    one executemany UPDATE per distinct set of changed fields and one DELETE, in
+    that order. Every update bumps the task version. Updates and deletes of
+    tasks the owner does not have, or that a concurrent request deleted, are
+    reported per item with status 404. Callers must not repeat a task id.
+    """
+    results = [None] * len(operations)
+    creates = [(index, operation) for index, operation in enumerate(operations) if operation.op == "create"]
+    updates = [(index, operation) for index, operation in enumerate(operations) if operation.op == "update"]
+    deletes = [(index, operation) for index, operation in enumerate(operations) if operation.op == "delete"]
+
+    created = []
+    if creates:
+        rows = [dict(operation.task.dict(), owner_id=owner_id) for _, operation in creates]
+        created = (await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows)).all()
+        for (index, _), db_task in zip(creates, created):
+            results[index] = {"index": index, "op": "create", "status": 200, "task": db_task}
+
+    referenced = {operation.id for _, operation in updates + deletes}
+    owned = set()
+    if referenced:
+        owned = set((await db.scalars(select(Task.id).filter(Task.id.in_(referenced), Task.owner_id == owner_id))).all())
+    for index, operation in updates + deletes:
+        if operation.id not in owned:
+            results[index] = {"index": index, "op": operation.op, "status": 404, "detail": "Task not found"}
+
+    updates = [(index, operation) for index, operation in updates if operation.id in owned]
+    updated = {}
+    if updates:
+        groups = defaultdict(list)
+        for _, operation in updates:
+            fields = operation.task.dict(exclude_unset=True)
+            groups[tuple(sorted(fields))].append(dict({"p_" + key: value for key, value in fields.items()}, p_id=operation.id))
+        for keys, rows in groups.items():
+            values = {key: bindparam("p_" + key) for key in keys}
+            statement = (
+                update(Task.__table__)
+                .where(Task.id == bindparam("p_id"), Task.owner_id == owner_id)
+                .values(**values, version=Task.version + 1)
+            )
+            await db.execute(statement, rows)
+        query = select(Task).filter(Task.id.in_({operation.id for _, operation in updates}), Task.owner_id == owner_id)
+        result = await db.scalars(query.execution_options(populate_existing=True))
+        updated = {db_task.id: db_task for db_task in result}
+        for index, operation in updates:
+            if operation.id in updated:
+                results[index] = {"index": index, "op": "update", "status": 200, "task": updated[operation.id]}
+            else:
+                # deleted by another request between the ownership check and the UPDATE
+                results[index] = {"index": index, "op": "update", "status": 404, "detail": "Task not found"}
+
+    deleted_ids = set()
+    to_delete = {operation.id for _, operation in deletes if operation.id in owned}
+    if to_delete:
+        statement = delete(Task).filter(Task.id.in_(to_delete), Task.owner_id == owner_id).returning(Task.id)
+        deleted_ids = set((await db.scalars(statement)).all())
+        for index, operation in deletes:
+            if operation.id in deleted_ids:
+                results[index] = {"index": index, "op": "delete", "status": 200}
+            elif operation.id in owned:
+                results[index] = {"index": index, "op": "delete", "status": 404, "detail": "Task not found"}
+
+    version = None
+    if created or updated or deleted_ids:
+        version = await bump_tasks_version(db, owner_id)
+    await db.commit()
+    written = [db_task for db_task in list(created) + list(updated.values()) if db_task.id not in deleted_ids]
+    for db_task in written:
+        search_backend.index(db_task)
+    for task_id in deleted_ids:
+        search_backend.remove(task_id)
+    if version is not None:
+        publish_tasks_changed(owner_id, version, written, deleted_ids)
+    return results
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from collections import defaultdict, deque
+from typing import AsyncIterator, Iterable, Optional
+from sqlalchemy.future import select
+from ..config import TASK_STREAM_HEARTBEAT_SECONDS, TASK_STREAM_HISTORY, TASK_STREAM_HISTORY_USERS, TASK_STREAM_QUEUE_SIZE
+from ..database import AsyncSessionLocal
+from ..models.task import Task
+from .cache import LRUCache
+from .invalidation import invalidation_bus
+from .metrics import registry
+from .serialization import dumps, task_row
+
+logger = logging.getLogger("app.task_events")
+
+STREAM_OVERFLOWS = registry.counter(
+    "task_stream_overflows_total", "Task stream subscribers that fell behind and were sent a resync event."
+)
+HEARTBEAT = b": keepalive\n\n"
+
+def sse_frame(event: str, version: Optional[int], data) -> bytes:
+    # a frame without an id keeps the client's last event id unchanged
+    event_id = b"" if version is None else b"id: %d\n" % version
+    return event_id + b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(data))
+
+def changes_frame(version: int, tasks: Iterable, deleted: Iterable[int] = ()) -> bytes:
+    """A ``tasks`` event; created tasks are the ones with version 1."""
+    return sse_frame("tasks", version, {"version": version, "tasks": [task_row(task) for task in tasks], "deleted": sorted(deleted)})
+
+def resync_frame(version: Optional[int]) -> bytes:
+    return sse_frame("resync", version, {"version": version})
+
+
+class Subscription:
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize)
+
+
+class TaskEventHub:
+    """Per-worker fan-out of task change events to the open streams of each owner.
+
+    Every subscriber has a bounded queue of pre-rendered frames. A subscriber whose queue
+    is full loses the queued frames and gets a single ``resync`` event instead, so a slow
+    client costs at most ``queue_size`` frames of memory. The last ``history`` events per
+    user are kept for resuming from ``Last-Event-ID``; event ids are the user's tasks version.
+    """
+
+    def __init__(self, queue_size: int = TASK_STREAM_QUEUE_SIZE, history: int = TASK_STREAM_HISTORY,
+                 history_users: int = TASK_STREAM_HISTORY_USERS, heartbeat: float = TASK_STREAM_HEARTBEAT_SECONDS):
+        self.queue_size = queue_size
+        self.history = history
+        self.heartbeat = heartbeat
+        self._subscribers = defaultdict(set)
+        self._history = LRUCache(history_users)
+        self._loading = set()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id: int, version: int, frame: bytes):
+        history = self._history.get(user_id)
+        if history is None:
+            history = deque(maxlen=self.history)
+            self._history.set(user_id, history)
+        history.append((version, frame))
+        for subscription in self._subscribers.get(user_id, ()):
+            self._offer(subscription, version, frame)
+
+    def _offer(self, subscription: Subscription, version: Optional[int], frame: bytes):
+        try:
+            subscription.queue.put_nowait((version, frame))
+        except asyncio.QueueFull:
+            STREAM_OVERFLOWS.inc()
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait((version, resync_frame(version)))
+
+    def replay(self, user_id: int, after: int, current: int) -> Optional[list]:
+        """Frames for versions after..current if this worker saw every one of them, else None."""
+        frames = {version: frame for version, frame in self._history.get(user_id, ()) if after < version <= current}
+        if len(frames) != current - after:
+            return None
+        return [frames[version] for version in sorted(frames)]
+
+    async def stream(self, subscription: Subscription, after: Optional[int], current: Optional[int]) -> AsyncIterator[bytes]:
+        """Frames for one client: catch-up from ``after``, then live events and heartbeats.
+
+        ``current`` is the tasks version read after subscribing, so live events up to it
+        are already covered by the catch-up and are skipped.
+        """
+        current = current or 0
+        try:
+            if after is None or after == current:
+                yield sse_frame("ready", current, {"version": current})
+            else:
+                frames = self.replay(subscription.user_id, after, current) if after < current else None
+                for frame in frames if frames is not None else [resync_frame(current)]:
+                    yield frame
+            while True:
+                try:
+                    version, frame = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if version is None or version > current:
+                    yield frame
+        finally:
+            self.unsubscribe(subscription)
+
+    def on_remote_change(self, payload: Optional[dict]):
+        if payload is None:
+            for subscribers in list(self._subscribers.values()):
+                for subscription in list(subscribers):
+                    self._offer(subscription, None, resync_frame(None))
+            return
+        if payload.get("version") is not None and payload["owner_id"] in self._subscribers:
+            task = asyncio.get_running_loop().create_task(self._publish_remote(payload))
+            self._loading.add(task)
+            task.add_done_callback(self._loading.discard)
+
+    async def _publish_remote(self, payload: dict):
+        deleted = set(payload.get("deleted", ()))
+        upserted = [task_id for task_id in payload["ids"] if task_id not in deleted]
+        rows = []
+        try:
+            if upserted:
+                query = select(Task.__table__).filter(Task.id.in_(upserted), Task.owner_id == payload["owner_id"])
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(query.order_by(Task.id))).all()
+        except Exception:
+            logger.exception("Cannot load tasks changed by another worker")
+            return
+        self.publish(payload["owner_id"], payload["version"], changes_frame(payload["version"], rows, deleted))
+
+task_event_hub = TaskEventHub()
+invalidation_bus.subscribe("tasks", task_event_hub.on_remote_change, remote_only=True)
+registry.gauge("task_stream_subscribers", "Open task event streams in this worker.",
+               callback=lambda: [((), task_event_hub.subscriber_count())])
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.future import select
+from ..models.task import Task, TaskArchive
+
+def _filter(query, columns, owner_id: int, status: Optional[str], priority: Optional[int], created_at: Optional[datetime]):
+    query = query.filter(columns.owner_id == owner_id)
+    if status:
+        query = query.filter(columns.status == status)
+    if priority:
+        query = query.filter(columns.priority == priority)
+    if created_at:
+        query = query.filter(columns.created_at >= created_at)
+    return query
+
+def task_list_query(owner_id: int, status: Optional[str] = None, priority: Optional[int] = None,
+                    created_at: Optional[datetime] = None, entity=Task):
+    """Base query behind GET /tasks; its filters are what the tasks indexes are designed for.
+
+    Pass ``entity=Task.__table__`` to select plain rows instead of ORM objects.
+    """
+    return _filter(select(entity), Task, owner_id, status, priority, created_at)
+
+def archived_task_list_query(owner_id: int, status: Optional[str] = None, priority: Optional[int] = None,
+                             created_at: Optional[datetime] = None):
+    """The same filters over tasks_archive, selecting exactly the columns of ``tasks``."""
+    archive = TaskArchive.__table__
+    return _filter(select(*(archive.c[column.key] for column in Task.__table__.c)), archive.c,
+                   owner_id, status, priority, created_at)
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ..config import TASKS_EXPORT_CHUNK, TASKS_IMPORT_CHUNK, TASKS_IMPORT_MAX_ERRORS, TASKS_IMPORT_MAX_LINE_BYTES
+from ..database import AsyncSessionLocal, replica_router
+from ..models.task import Task
+from ..schemas.task import TaskCreate
+from .change_version import bump_tasks_version, publish_tasks_changed
+from .search import search_backend
+from .serialization import TASK_FIELDS, dumps, task_row
+from .task_queries import archived_task_list_query, task_list_query
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(row[field]) for field in TASK_FIELDS])
+    return buffer.getvalue().encode()
+
+def export_query(owner_id: int, include_archived: bool = True):
+    query = task_list_query(owner_id, entity=Task.__table__)
+    if not include_archived:
+        return query.order_by(Task.id)
+    merged = union_all(query, archived_task_list_query(owner_id)).subquery()
+    return select(merged).order_by(merged.c.id)
+
+async def export_tasks(owner_id: int, fmt: str, sticky: bool = False, include_archived: bool = True,
+                       chunk_size: int = TASKS_EXPORT_CHUNK, session_factory=AsyncSessionLocal) -> AsyncIterator[bytes]:
+    """Encode every task of the owner, ``chunk_size`` rows at a time from a server-side cursor.
+
+    Archived tasks are included unless ``include_archived`` is false, so an export holds all
+    of the user's data. The generator owns its session, so the connection is held only while the body streams.
+    """
+    if fmt == "csv":
+        yield _csv_chunk([dict(zip(TASK_FIELDS, TASK_FIELDS))])
+    query = export_query(owner_id, include_archived)
+    async with replica_router.session(session_factory, sticky) as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            rows = [task_row(row) for row in rows]
+            if fmt == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line: int = TASKS_IMPORT_MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Split a byte stream into numbered lines; a line longer than ``max_line`` comes out as None."""
+    buffer, number, oversized = bytearray(), 0, False
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            number += 1
+            too_long = oversized or end - start > max_line
+            yield number, None if too_long else bytes(buffer[start:end]).rstrip(b"\r")
+            start, oversized = end + 1, False
+        # consumed lines are dropped once per chunk, not once per line
+        del buffer[:start]
+        if len(buffer) > max_line:
+            buffer.clear()
+            oversized = True
+    if buffer or oversized:
+        yield number + 1, None if oversized else bytes(buffer).rstrip(b"\r")
+
+
+class ImportReport:
+    def __init__(self, max_errors: int = TASKS_IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line: int, detail: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors())
+
+class _CsvRecords:
+    """Reassembles CSV records from lines, joining lines while a quoted field is open."""
+
+    def __init__(self, max_record: int = TASKS_IMPORT_MAX_LINE_BYTES):
+        self.max_record = max_record
+        self.header: Optional[List[str]] = None
+        self._pending: List[str] = []
+        self._start = 0
+
+    def feed(self, number: int, line: str) -> Iterator[Tuple[int, Optional[dict]]]:
+        """Yield (first line number, row dict) for each completed record; the dict is None for a malformed one."""
+        if not self._pending:
+            self._start = number
+        self._pending.append(line)
+        record = "\n".join(self._pending)
+        if record.count('"') % 2:
+            if len(record) > self.max_record:
+                self._pending = []
+                yield self._start, None
+            return
+        self._pending = []
+        values = next(csv.reader([record]), [])
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return
+        if not any(value.strip() for value in values):
+            return
+        if len(values) != len(self.header):
+            yield self._start, None
+            return
+        # empty CSV cells stand for missing values so optional fields fall back to their defaults
+        yield self._start, {name: value for name, value in zip(self.header, values) if value != ""}
+
+    def unterminated(self) -> Optional[int]:
+        return self._start if self._pending else None
+
+
+async def import_tasks(db: AsyncSession, owner_id: int, fmt: str, chunks: AsyncIterator[bytes],
+                       chunk_size: int = TASKS_IMPORT_CHUNK) -> dict:
+    """Validate each record against TaskCreate and insert valid ones in multi-row batches.
+
+    Every batch is committed together with a tasks version bump, so memory stays bounded
+    by ``chunk_size`` rows and a failure late in the file keeps the batches before it.
+    """
+    report = ImportReport()
+    batch: List[dict] = []
+    records = _CsvRecords() if fmt == "csv" else None
+
+    async def flush():
+        if not batch:
+            return
+        statement = insert(Task).returning(Task, sort_by_parameter_order=True)
+        created = (await db.scalars(statement, batch)).all()
+        version = await bump_tasks_version(db, owner_id)
+        await db.commit()
+        for db_task in created:
+            search_backend.index(db_task)
+        publish_tasks_changed(owner_id, version, created)
+        report.imported += len(created)
+        batch.clear()
+
+    def accept(number: int, data) -> None:
+        if not isinstance(data, dict):
+            report.error(number, "Expected an object" if records is None else "Malformed CSV record")
+            return
+        try:
+            task = TaskCreate.model_validate(data)
+        except ValidationError as exc:
+            report.error(number, _validation_detail(exc))
+            return
+        batch.append(dict(task.model_dump(), owner_id=owner_id))
+
+    async for number, line in iter_lines(chunks):
+        if line is None:
+            report.error(number, "Line is too long")
+            continue
+        try:
+            text = line.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            report.error(number, "Line is not valid UTF-8")
+            continue
+        if records is not None:
+            for start, data in records.feed(number, text):
+                accept(start, data)
+        elif text.strip():
+            try:
+                accept(number, json.loads(text))
+            except ValueError as exc:
+                report.error(number, f"Invalid JSON: {exc}")
+        if len(batch) >= chunk_size:
+            await flush()
+    if records is not None and records.unterminated() is not None:
+        report.error(records.unterminated(), "Unterminated quoted field")
+    await flush()
+    return report.as_dict()
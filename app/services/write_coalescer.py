@@ -0,0 +1,116 @@
+import asyncio
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from sqlalchemy import insert
+from ..config import TASK_WRITE_COALESCE_MAX, TASK_WRITE_COALESCE_MS, TASK_WRITE_COALESCING
+from ..database import AsyncSessionLocal
+from ..models.task import Task
+from .change_version import bump_tasks_version, publish_tasks_changed
+from .metrics import registry
+from .search import search_backend
+
+COALESCED_ROWS = registry.histogram(
+    "task_create_coalesced_rows", "Tasks written by one coalesced INSERT and commit.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+COALESCE_FALLBACKS = registry.counter(
+    "task_create_coalesce_fallbacks_total", "Coalesced batches that failed and were retried row by row."
+)
+
+Pending = Tuple[int, dict, asyncio.Future]
+
+class TaskCreateCoalescer:
+    """Group commit for task creation.
+
+    Creates arriving within ``window_ms`` of the first one, up to ``max_rows``, are written
+    by one multi-row INSERT ... RETURNING and a single commit, with one tasks version bump
+    per owner. If the batch fails, every row is retried in its own transaction so an error
+    reaches only the request that caused it.
+    """
+
+    def __init__(self, window_ms: float = TASK_WRITE_COALESCE_MS, max_rows: int = TASK_WRITE_COALESCE_MAX,
+                 session_factory=AsyncSessionLocal):
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self.session_factory = session_factory
+        self._pending: List[Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()
+
+    async def create(self, owner_id: int, values: dict) -> Task:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((owner_id, values, future))
+        if len(self._pending) >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        # shielded so a disconnecting client does not cancel the shared write
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            flush = asyncio.get_running_loop().create_task(self._write_batch(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _write_batch(self, batch: List[Pending]):
+        try:
+            try:
+                written = [(batch, await self._write(batch))]
+                COALESCED_ROWS.observe(len(batch))
+            except Exception:
+                if len(batch) == 1:
+                    raise
+                COALESCE_FALLBACKS.inc()
+                written = []
+                for item in batch:
+                    try:
+                        written.append(([item], await self._write([item])))
+                    except Exception as exc:
+                        _resolve(item[2], exception=exc)
+            # delivery runs after the commit, so its errors must never send rows back to _write
+            for items, (created, versions) in written:
+                try:
+                    self._deliver(items, created, versions)
+                except Exception as exc:
+                    for _, _, future in items:
+                        _resolve(future, exception=exc)
+        except Exception as exc:
+            for _, _, future in batch:
+                _resolve(future, exception=exc)
+        finally:
+            for _, _, future in batch:
+                _resolve(future, exception=RuntimeError("Task creation was interrupted"))
+
+    async def _write(self, batch: List[Pending]):
+        rows = [dict(values, owner_id=owner_id) for owner_id, values, _ in batch]
+        async with self.session_factory() as db:
+            statement = insert(Task).returning(Task, sort_by_parameter_order=True)
+            created = (await db.scalars(statement, rows)).all()
+            # owners in a fixed order so concurrent batches lock user rows consistently
+            versions = {owner_id: await bump_tasks_version(db, owner_id) for owner_id in sorted({row["owner_id"] for row in rows})}
+            await db.commit()
+        return created, versions
+
+    def _deliver(self, batch: List[Pending], created: List[Task], versions: dict):
+        by_owner = defaultdict(list)
+        for (owner_id, _, future), db_task in zip(batch, created):
+            search_backend.index(db_task)
+            by_owner[owner_id].append(db_task)
+            _resolve(future, result=db_task)
+        for owner_id, tasks in by_owner.items():
+            publish_tasks_changed(owner_id, versions[owner_id], tasks)
+
+def _resolve(future: asyncio.Future, result=None, exception: Optional[BaseException] = None):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+task_create_coalescer = TaskCreateCoalescer() if TASK_WRITE_COALESCING else None
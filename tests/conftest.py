@@ -0,0 +1,44 @@
+import httpx
+import pytest_asyncio
+from fastapi import FastAPI, Header
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.dependencies import get_current_user, get_db, get_read_db
+from app.migrations import upgrade
+from app.models.user import User
+from app.routes import task
+from app.services.auth_service import Principal
+from app.services.change_version import task_list_cache
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Sessions on a migrated temporary SQLite database with users 1 and 2."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    await upgrade(engine)
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{"id": 1, "name": "a", "email": "a@x"}, {"id": 2, "name": "b", "email": "b@x"}])
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def task_client(session_factory):
+    """Client for the /tasks routes on the session_factory database.
+
+    Requests act as user 1, or as the user in an ``X-Test-User`` header.
+    """
+    app = FastAPI()
+    app.include_router(task.router)
+
+    async def db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = app.dependency_overrides[get_read_db] = db
+    def current_user(x_test_user: int = Header(1)):
+        return Principal(id=x_test_user, email=f"{x_test_user}@x", name=str(x_test_user))
+
+    app.dependency_overrides[get_current_user] = current_user
+    task_list_cache.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.migrations import upgrade
+from app.services.admission import (
+    AdmissionMiddleware, AdmissionPolicy, ConcurrencyLimit, DatabaseRateLimitBackend, MemoryRateLimitBackend, parse_rate,
+)
+
+def test_parse_rate():
+    assert parse_rate("20/60") == (20 / 60, 20)
+    assert parse_rate("0") is None and parse_rate("") is None
+
+async def _exhaust(backend, now=1000.0):
+    # 2 requests per second with bursts of 3
+    results = [await backend.take("k", 2.0, 3, now=now) for _ in range(4)]
+    assert results[:3] == [0.0, 0.0, 0.0]
+    assert results[3] == pytest.approx(0.5)
+    assert await backend.take("k", 2.0, 3, now=now + 0.5) == 0.0
+    assert await backend.take("other", 2.0, 3, now=now) == 0.0
+
+@pytest.mark.asyncio
+async def test_memory_backend_allows_burst_then_refills():
+    await _exhaust(MemoryRateLimitBackend())
+
+@pytest.mark.asyncio
+async def test_database_backend_matches_memory_backend(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'limits.db'}")
+    await upgrade(engine)
+    await _exhaust(DatabaseRateLimitBackend(engine))
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_times_out_waiters():
+    limit = ConcurrencyLimit(1, timeout=0.05)
+    assert await limit.acquire()
+    assert not await limit.acquire()
+    waiter = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0.01)
+    assert limit.waiting == 1
+    limit.release()
+    assert await waiter and limit.in_flight == 1
+
+def test_middleware_rejects_with_retry_after_and_passes_other_routes():
+    app = FastAPI()
+
+    @app.post("/auth/login")
+    async def login():
+        return {}
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    policy = AdmissionPolicy("auth", frozenset({("POST", "/auth/login")}), ConcurrencyLimit(2, 0.1), (1 / 60, 2), "ip")
+    app.add_middleware(AdmissionMiddleware, policies=[policy], backend=MemoryRateLimitBackend())
+    client = TestClient(app)
+    assert [client.post("/auth/login").status_code for _ in range(2)] == [200, 200]
+    rejected = client.post("/auth/login")
+    assert rejected.status_code == 429 and rejected.headers["Retry-After"] == "60"
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+from app.models.task import Task, TaskArchive
+from app.models.user import User
+from app.services.archive import archive_tasks
+from app.services.pagination import decode_cursor, paginate, paginate_union, split_page
+from app.services.task_queries import archived_task_list_query, task_list_query
+
+NOW = datetime(2025, 6, 1)
+
+@pytest_asyncio.fixture(autouse=True)
+async def seed_tasks(session_factory):
+    async with session_factory() as db:
+        await db.execute(insert(Task), [
+            {
+                "id": i,
+                "title": f"t{i}",
+                "owner_id": 1 + i % 2,
+                "status": "done" if i % 3 else "pending",
+                "priority": i % 4,
+                "created_at": NOW - timedelta(days=i * 10),
+            }
+            for i in range(1, 31)
+        ])
+        await db.commit()
+
+async def _ids(session_factory, entity):
+    async with session_factory() as db:
+        return set((await db.scalars(select(entity.id))).all())
+
+@pytest.mark.asyncio
+async def test_archive_moves_only_old_tasks_in_the_status(session_factory):
+    expected = {i for i in range(1, 31) if i % 3 and i * 10 > 90}
+    moved = await archive_tasks(timedelta(days=90), "done", batch_size=4, now=NOW, session_factory=session_factory)
+    assert moved == len(expected)
+    assert await _ids(session_factory, TaskArchive) == expected
+    assert await _ids(session_factory, Task) == set(range(1, 31)) - expected
+    async with session_factory() as db:
+        archived = (await db.scalars(select(TaskArchive).filter(TaskArchive.id == 20))).one()
+        versions = dict((await db.execute(select(User.id, User.tasks_version))).all())
+    assert (archived.title, archived.owner_id, archived.archived_at) == ("t20", 1, NOW)
+    assert versions[1] > 0 and versions[2] > 0
+    assert await archive_tasks(timedelta(days=90), "done", now=NOW, session_factory=session_factory) == 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order_by", ["created_at", "-created_at", "priority", "-priority"])
+async def test_union_pages_cover_both_tables_in_order(session_factory, order_by):
+    await archive_tasks(timedelta(days=90), "done", now=NOW, session_factory=session_factory)
+    async with session_factory() as db:
+        everything = (await db.execute(paginate(task_list_query(1, entity=Task.__table__), order_by, None, 100))).all()
+        everything += (await db.execute(paginate(archived_task_list_query(1), order_by, None, 100, archived_task_list_query(1).selected_columns))).all()
+        key = order_by.lstrip("-")
+        expected = [row.id for row in sorted(everything, key=lambda row: (getattr(row, key), row.id), reverse=order_by.startswith("-"))]
+        seen, cursor = [], None
+        while True:
+            queries = [task_list_query(1, entity=Task.__table__), archived_task_list_query(1)]
+            rows, next_cursor = split_page((await db.execute(paginate_union(queries, order_by, cursor, 4))).all(), order_by, 4)
+            seen += [row.id for row in rows]
+            if next_cursor is None:
+                break
+            cursor = decode_cursor(next_cursor, order_by)
+    assert seen == expected
+    assert len(seen) == 15
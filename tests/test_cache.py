@@ -0,0 +1,19 @@
+import time
+from app.services.cache import LRUCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+def test_entries_expire():
+    cache = LRUCache(10, ttl=60)
+    cache.set("past", 1, expires_at=time.time() - 1)
+    cache.set("default", 2)
+    assert cache.get("past") is None
+    assert cache.get("default") == 2
+    assert len(cache) == 1
@@ -0,0 +1,58 @@
+import pytest
+from app.services.etag import if_none_match, list_etag, parse_if_match, task_etag
+
+def test_parse_if_match():
+    assert parse_if_match('"v3"') == [3]
+    assert parse_if_match('"v3", "v4", W/"v5", "junk"') == [3, 4]
+    assert parse_if_match("*") is None
+
+def test_list_etag_depends_on_user_version_and_params():
+    etag = list_etag(1, 3, [("status", "done")])
+    assert etag == list_etag(1, 3, [("status", "done")])
+    assert etag != list_etag(2, 3, [("status", "done")])
+    assert etag != list_etag(1, 4, [("status", "done")])
+    assert etag != list_etag(1, 3, [("status", "pending")])
+
+def test_if_none_match_uses_weak_comparison():
+    etag = list_etag(1, 1, [])
+    assert if_none_match(etag, etag)
+    assert if_none_match(f'"other", W/{etag}', etag)
+    assert if_none_match("*", etag)
+    assert not if_none_match(None, etag)
+    assert not if_none_match(task_etag(1), etag)
+
+
+async def _create(task_client):
+    response = await task_client.post("/tasks", json={"title": "t", "priority": 1})
+    assert response.status_code == 200 and response.headers["etag"] == '"v1"'
+    return response.json()["id"]
+
+@pytest.mark.asyncio
+async def test_update_with_matching_if_match_bumps_the_version(task_client):
+    task_id = await _create(task_client)
+    response = await task_client.put(f"/tasks/{task_id}", json={"priority": 2}, headers={"If-Match": '"v1"'})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2 and response.headers["etag"] == '"v2"'
+
+@pytest.mark.asyncio
+async def test_update_with_stale_if_match_is_rejected(task_client):
+    task_id = await _create(task_client)
+    await task_client.put(f"/tasks/{task_id}", json={"priority": 2})
+    response = await task_client.put(f"/tasks/{task_id}", json={"priority": 3}, headers={"If-Match": '"v1"'})
+    assert response.status_code == 412
+    assert (await task_client.put(f"/tasks/{task_id}", json={"priority": 3}, headers={"If-Match": "*"})).json()["version"] == 3
+
+@pytest.mark.asyncio
+async def test_if_match_on_a_missing_task_is_not_found(task_client):
+    response = await task_client.put("/tasks/999", json={"priority": 2}, headers={"If-Match": '"v1"'})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_list_etag_of_one_user_never_matches_another(task_client):
+    first = await task_client.get("/tasks")
+    etag = first.headers["etag"]
+    assert (await task_client.get("/tasks", headers={"If-None-Match": etag})).status_code == 304
+    # user 2 is at the same tasks version; the first request misses the response cache, the second hits it
+    for _ in range(2):
+        response = await task_client.get("/tasks", headers={"If-None-Match": etag, "X-Test-User": "2"})
+        assert response.status_code == 200 and response.headers["etag"] != etag
@@ -0,0 +1,53 @@
+import json
+from types import SimpleNamespace
+from app.database import worker_pool_limits
+from app.services.auth_service import cache_principal, get_cached_principal, invalidate_user
+from app.services.invalidation import LocalInvalidationBus, PostgresInvalidationBus, resolve_bus_backend
+from app.services.search import InMemorySearchBackend
+
+def test_local_bus_skips_remote_only_handlers_for_own_messages():
+    bus, seen = LocalInvalidationBus(), []
+    bus.subscribe("tasks", lambda payload: seen.append(("all", payload)))
+    bus.subscribe("tasks", lambda payload: seen.append(("remote", payload)), remote_only=True)
+    bus.publish("tasks", {"ids": [1]})
+    assert seen == [("all", {"ids": [1]})]
+    bus.reset()
+    assert seen[1:] == [("all", None), ("remote", None)]
+
+def test_postgres_bus_ignores_its_own_notifications():
+    sender, receiver = PostgresInvalidationBus("postgresql://db"), PostgresInvalidationBus("postgresql://db")
+    seen = []
+    for bus in (sender, receiver):
+        bus.subscribe("user", lambda payload, bus=bus: seen.append((bus, payload)))
+    message = sender.encode("user", {"id": 7})
+    sender._on_notify(None, 1, sender.channel, message)
+    receiver._on_notify(None, 1, receiver.channel, message)
+    assert seen == [(receiver, {"id": 7})]
+
+def test_postgres_bus_degrades_oversized_payloads_to_reset():
+    bus = PostgresInvalidationBus("postgresql://db")
+    assert json.loads(bus.encode("tasks", {"ids": list(range(5000))}))["p"] is None
+
+def test_bus_backend_follows_database_dialect():
+    assert resolve_bus_backend("auto", "postgresql+asyncpg://u:p@db/app") == "postgres"
+    assert resolve_bus_backend("auto", "sqlite+aiosqlite:///app.db") == "local"
+
+def test_worker_pool_limits_stay_within_budget():
+    limits = worker_pool_limits(100, 8, reserved=1)
+    assert limits == {"pool_size": 9, "max_overflow": 2}
+    assert 8 * (sum(limits.values()) + 1) <= 100
+    assert sum(worker_pool_limits(4, 8).values()) == 1
+
+def test_invalidate_user_drops_cached_principal():
+    user = SimpleNamespace(id=41, name="n", email="e@example.com")
+    cache_principal(user)
+    invalidate_user(41)
+    assert get_cached_principal(41) is None
+
+def test_memory_search_marks_remote_changes_stale():
+    backend = InMemorySearchBackend()
+    backend._built = True
+    backend.invalidate({"owner_id": 1, "ids": [3, 4]})
+    assert backend._stale == {3, 4}
+    backend.invalidate(None)
+    assert not backend._built
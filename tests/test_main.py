@@ -46,4 +46,4 @@ async def test_get_tasks(db_session):
     client.post("/tasks", json={"title": "Test Task", "priority": 1}, headers={"Authorization": f"Bearer {token}"})
     response = client.get("/tasks", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
-    assert len(response.json()) == 1
\ No newline at end of file
+    assert len(response.json()["items"]) == 1
\ No newline at end of file
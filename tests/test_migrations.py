@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import Base
+from app.migrations import HEAD, SchemaOutOfDate, check_schema, current_version, upgrade
+from app.migrations.m0001_initial import metadata as baseline_metadata
+import app.models.rate_limit  # noqa: F401  registers the models on Base.metadata
+import app.models.task  # noqa: F401
+import app.models.user  # noqa: F401
+
+def _schema(conn):
+    inspector = inspect(conn)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {(index["name"], tuple(index["column_names"]), bool(index["unique"])) for index in inspector.get_indexes(table)},
+        )
+        for table in ("users", "tasks", "rate_limits", "tasks_archive")
+    }
+
+@pytest.mark.asyncio
+async def test_migrations_produce_the_model_schema(tmp_path):
+    migrated = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}")
+    modelled = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'modelled.db'}")
+    with pytest.raises(SchemaOutOfDate):
+        await check_schema(migrated)
+    assert await upgrade(migrated) == HEAD
+    assert await upgrade(migrated) == HEAD
+    assert await check_schema(migrated) == HEAD
+    async with modelled.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with migrated.connect() as conn:
+        migrated_schema = await conn.run_sync(_schema)
+    async with modelled.connect() as conn:
+        modelled_schema = await conn.run_sync(_schema)
+    assert migrated_schema == modelled_schema
+    await migrated.dispose()
+    await modelled.dispose()
+
+@pytest.mark.asyncio
+async def test_upgrade_adopts_a_database_created_before_migrations(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(baseline_metadata.create_all)
+    assert await current_version(engine) == 0
+    await upgrade(engine)
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("tasks")})
+    assert "version" in columns
+    await engine.dispose()
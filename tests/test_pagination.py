@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from app.services.pagination import decode_cursor, encode_cursor, split_page
+
+def test_cursor_round_trip():
+    task = SimpleNamespace(id=7, created_at=datetime(2025, 5, 7, 12, 0), priority=2)
+    cursor = encode_cursor("-created_at", task)
+    assert decode_cursor(cursor, "-created_at") == {"o": "-created_at", "v": task.created_at, "id": 7}
+
+def test_cursor_rejects_other_ordering_and_garbage():
+    task = SimpleNamespace(id=7, created_at=datetime(2025, 5, 7, 12, 0), priority=2)
+    assert decode_cursor(encode_cursor("priority", task), "created_at") is None
+    assert decode_cursor("not-a-cursor", "created_at") is None
+
+def test_split_page_emits_cursor_only_when_more_rows():
+    rows = [SimpleNamespace(id=i, created_at=datetime(2025, 5, i), priority=i) for i in range(1, 5)]
+    items, next_cursor = split_page(rows, "priority", 3)
+    assert [row.id for row in items] == [1, 2, 3]
+    assert decode_cursor(next_cursor, "priority")["id"] == 3
+    items, next_cursor = split_page(rows, "priority", 4)
+    assert len(items) == 4 and next_cursor is None
+
+def _raw_cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+def test_cursor_rejects_values_of_the_wrong_type():
+    assert decode_cursor(_raw_cursor({"o": "priority", "v": "abc", "id": 1}), "priority") is None
+    assert decode_cursor(_raw_cursor({"o": "priority", "v": 2, "id": True}), "priority") is None
+    assert decode_cursor(_raw_cursor({"o": "rank", "v": "abc", "id": 1}), "rank") is None
+    assert decode_cursor(_raw_cursor({"o": "rank", "v": None, "id": 1}), "rank") is None
+    assert decode_cursor(_raw_cursor({"o": "created_at", "v": 5, "id": 1}), "created_at") is None
+    assert decode_cursor(_raw_cursor(["o", "v"]), "rank") is None
+    assert decode_cursor(_raw_cursor({"o": "rank", "v": 0.5, "id": 1}), "rank")["v"] == 0.5
+    assert decode_cursor(_raw_cursor({"o": "-priority", "v": None, "id": 1}), "-priority") is None
+    assert decode_cursor(_raw_cursor({"o": "created_at", "v": None, "id": 1}), "created_at") is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order_by", ["created_at", "-created_at", "priority", "-priority"])
+async def test_get_tasks_walks_every_page_through_next_cursor(task_client, order_by):
+    created = [(await task_client.post("/tasks", json={"title": f"t{i}", "priority": i % 3})).json() for i in range(7)]
+    key = order_by.lstrip("-")
+    expected = [task["id"] for task in sorted(created, key=lambda task: (task[key], task["id"]), reverse=order_by.startswith("-"))]
+    seen, params = [], {"order_by": order_by, "limit": 3}
+    while True:
+        page = (await task_client.get("/tasks", params=params)).json()
+        seen += [task["id"] for task in page["items"]]
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert seen == expected
+    tampered = _raw_cursor({"o": order_by, "v": None, "id": expected[0]})
+    assert (await task_client.get("/tasks", params={"order_by": order_by, "cursor": tampered})).status_code == 400
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from app.config import BCRYPT_ROUNDS
+from app.services.auth_service import pwd_context
+from app.services.password_hasher import HashQueueFull, PasswordHasher
+
+@pytest.mark.asyncio
+async def test_verify_and_update_rehashes_weaker_cost():
+    hasher = PasswordHasher("thread", workers=1, queue_size=1)
+    weak_hash = pwd_context.hash("password", rounds=4)
+    verified, new_hash = await hasher.verify_and_update("password", weak_hash)
+    assert verified and new_hash is not None
+    assert await hasher.verify_and_update("password", new_hash) == (True, None)
+    assert hasher.stats()["completed"] == 2
+    hasher.shutdown()
+
+def test_hashes_with_any_other_cost_need_an_update():
+    weak_hash = pwd_context.hash("password", rounds=4)
+    # only the cost field is read, so a stronger hash need not be computed
+    strong_hash = weak_hash.replace("$04$", f"${BCRYPT_ROUNDS + 1:02d}$", 1)
+    assert pwd_context.needs_update(weak_hash) and pwd_context.needs_update(strong_hash)
+    assert not pwd_context.needs_update(pwd_context.hash("password"))
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    hasher = PasswordHasher("thread", workers=1, queue_size=0)
+    results = await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+    assert isinstance(results[1], HashQueueFull)
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_not_counted_as_completed():
+    hasher = PasswordHasher("thread", workers=1, queue_size=1)
+    with pytest.raises(ValueError):
+        await hasher.verify_and_update("password", "not a bcrypt hash")
+    assert hasher.stats()["completed"] == 0
+    hasher.shutdown()
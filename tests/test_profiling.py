@@ -0,0 +1,86 @@
+import os
+import time
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.services import profiling
+from app.services.profiling import ProfilingMiddleware, SlowRequestLog, redact_query, save_profile, timed
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        with timed("query"):
+            end = time.perf_counter() + 0.02
+            while time.perf_counter() < end:
+                pass
+        return {}
+
+    async def slow_body():
+        yield b"first"
+        time.sleep(0.05)
+        yield b"last"
+
+    @app.get("/download")
+    async def download():
+        return StreamingResponse(slow_body(), media_type="text/plain")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(slow_body(), media_type="text/event-stream")
+
+    app.add_middleware(ProfilingMiddleware, sample_rate=0)
+    return app
+
+def test_timed_is_a_no_op_outside_requests():
+    with timed("query"):
+        pass
+
+def test_slow_request_log_keeps_the_slowest():
+    log = SlowRequestLog(size=2)
+    for duration in (0.3, 0.1, 0.5, 0.2):
+        log.add(duration, {"d": duration})
+    assert [entry["d"] for entry in log.entries()] == [0.5, 0.3]
+    assert log.threshold() == 0.3
+
+def test_server_timing_header_and_slow_log(monkeypatch):
+    monkeypatch.setattr(profiling, "slow_requests", SlowRequestLog(size=5))
+    response = TestClient(_app()).get("/work")
+    phases = dict(part.split(";", 1)[0:2] for part in response.headers["server-timing"].split(", "))
+    assert float(phases["query"].split("=")[1]) >= 20
+    entry = profiling.slow_requests.entries()[0]
+    assert entry["path"] == "/work" and entry["phases_ms"]["query"] >= 20 and entry["profile_id"] is None
+
+def test_admin_header_writes_folded_profile(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    client = TestClient(_app())
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "wrong"}).headers
+    profile_id = client.get("/work", headers={"X-Profile": "secret"}).headers["x-profile-id"]
+    with open(os.path.join(tmp_path, f"{profile_id}.folded")) as file:
+        lines = file.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("work (test_profiling.py" in line for line in lines)
+
+def test_streamed_responses_log_time_to_first_byte_and_event_streams_are_skipped(monkeypatch):
+    monkeypatch.setattr(profiling, "slow_requests", SlowRequestLog(size=5))
+    client = TestClient(_app())
+    client.get("/download")
+    client.get("/events")
+    entries = profiling.slow_requests.entries()
+    assert [entry["path"] for entry in entries] == ["/download"]
+    assert entries[0]["streamed"] and entries[0]["duration_ms"] < 50
+
+def test_saved_profiles_are_capped(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    for index in range(5):
+        save_profile(f"p{index}", "main 1\n", keep=3)
+        os.utime(tmp_path / f"p{index}.folded", (index, index))
+    assert sorted(os.listdir(tmp_path)) == ["p2.folded", "p3.folded", "p4.folded"]
+
+def test_slow_log_redacts_secret_query_parameters(monkeypatch):
+    monkeypatch.setattr(profiling, "slow_requests", SlowRequestLog(size=5))
+    TestClient(_app()).get("/work?refresh_token=abc.def&status=done")
+    assert profiling.slow_requests.entries()[0]["query"] == "refresh_token=[redacted]&status=done"
+    assert redact_query(b"Password=x&access_token=y&q=a%20b") == "Password=[redacted]&access_token=[redacted]&q=a+b"
@@ -0,0 +1,110 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event, insert
+from app.database import Base
+from app.models.task import Task
+from app.models.user import User
+from app.services.pagination import paginate
+from app.services.task_queries import task_list_query
+
+SEED_TASKS = int(os.getenv("QUERY_PLAN_TASKS", 50000))
+SEED_OWNERS = 50
+PAGE_SIZE = 50
+QUERY_BUDGET_SECONDS = float(os.getenv("QUERY_PLAN_BUDGET", 0.05))
+BASE_TIME = datetime(2024, 1, 1)
+
+FILTERS = [
+    {},
+    {"status": "done"},
+    {"priority": 2},
+    {"created_at": BASE_TIME + timedelta(days=3)},
+    {"status": "done", "created_at": BASE_TIME + timedelta(days=3)},
+    {"status": "done", "priority": 2},
+]
+ORDERINGS = ["created_at", "-created_at", "priority", "-priority"]
+
+# Filter/ordering pairs whose index delivers rows already sorted, so no page ever sorts
+SORT_FREE = [
+    ({}, "created_at", "ix_tasks_owner_created"),
+    ({}, "-created_at", "ix_tasks_owner_created"),
+    ({}, "priority", "ix_tasks_owner_priority"),
+    ({}, "-priority", "ix_tasks_owner_priority"),
+    ({"status": "done"}, "created_at", "ix_tasks_owner_status_created"),
+    ({"status": "done"}, "-created_at", "ix_tasks_owner_status_created"),
+    ({"created_at": BASE_TIME + timedelta(days=3)}, "created_at", "ix_tasks_owner_created"),
+    ({"created_at": BASE_TIME + timedelta(days=3)}, "-created_at", "ix_tasks_owner_created"),
+]
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": owner_id, "name": "user", "email": f"{owner_id}@example.com", "hashed_password": ""}
+            for owner_id in range(1, SEED_OWNERS + 1)
+        ])
+        conn.execute(insert(Task), [
+            {
+                "title": f"Task {i}",
+                "owner_id": i % SEED_OWNERS + 1,
+                "status": ("pending", "in_progress", "done")[i % 3],
+                "priority": i % 5,
+                "created_at": BASE_TIME + timedelta(minutes=i),
+            }
+            for i in range(SEED_TASKS)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    engine.explain = False
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if engine.explain:
+            statement = "EXPLAIN QUERY PLAN " + statement
+        return statement, parameters
+
+    yield engine
+    engine.dispose()
+
+def _cursor(order_by):
+    value = BASE_TIME + timedelta(days=1) if "created_at" in order_by else 2
+    return {"v": value, "id": SEED_TASKS // 2}
+
+def _query(filters, order_by, cursor):
+    return paginate(task_list_query(7, **filters), order_by, cursor, PAGE_SIZE)
+
+def _plan(engine, query):
+    engine.explain = True
+    try:
+        with engine.connect() as conn:
+            return [row[3] for row in conn.execute(query).cursor.fetchall()]
+    finally:
+        engine.explain = False
+
+@pytest.mark.parametrize("order_by", ORDERINGS)
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("with_cursor", [False, True])
+def test_task_list_uses_owner_index(engine, filters, order_by, with_cursor):
+    plan = _plan(engine, _query(filters, order_by, _cursor(order_by) if with_cursor else None))
+    assert plan[0].startswith("SEARCH tasks USING INDEX ix_tasks_owner_"), plan
+    assert not any(step.startswith("SCAN tasks") for step in plan), plan
+
+@pytest.mark.parametrize("filters,order_by,index", SORT_FREE)
+@pytest.mark.parametrize("with_cursor", [False, True])
+def test_task_list_pages_without_sorting(engine, filters, order_by, index, with_cursor):
+    plan = _plan(engine, _query(filters, order_by, _cursor(order_by) if with_cursor else None))
+    assert plan[0].startswith(f"SEARCH tasks USING INDEX {index} "), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+@pytest.mark.parametrize("order_by", ORDERINGS)
+@pytest.mark.parametrize("filters", FILTERS)
+def test_task_list_page_timing(engine, filters, order_by):
+    with engine.connect() as conn:
+        for cursor in (None, _cursor(order_by)):
+            start = time.perf_counter()
+            rows = conn.execute(_query(filters, order_by, cursor)).all()
+            elapsed = time.perf_counter() - start
+            assert len(rows) <= PAGE_SIZE + 1
+            assert elapsed < QUERY_BUDGET_SECONDS, f"{filters} {order_by}: {elapsed:.4f}s"
@@ -0,0 +1,44 @@
+import time
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.services.replicas import STICKY_COOKIE, ReplicaRouter, wants_primary
+
+async def _named_engine(path, name):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE node (name TEXT)"))
+        await conn.execute(text("INSERT INTO node VALUES (:name)"), {"name": name})
+    return engine
+
+async def _node(router, primary_factory, sticky=False):
+    async with router.session(primary_factory, sticky) as session:
+        return await session.scalar(text("SELECT name FROM node"))
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_fail_over_and_stick_to_primary(tmp_path):
+    primary = await _named_engine(tmp_path / "primary.db", "primary")
+    replica_a = await _named_engine(tmp_path / "a.db", "a")
+    replica_b = await _named_engine(tmp_path / "b.db", "b")
+    dead = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'dead.db'}")
+    primary_factory = sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+    router = ReplicaRouter([replica_a, dead, replica_b], retry_after=60)
+
+    seen = [await _node(router, primary_factory) for _ in range(4)]
+    assert set(seen) == {"a", "b"}
+    assert router.healthy() == [replica_a, replica_b]
+    assert await _node(router, primary_factory, sticky=True) == "primary"
+
+    router.mark_down(replica_a)
+    router.mark_down(replica_b)
+    assert await _node(router, primary_factory) == "primary"
+
+    for engine in (primary, replica_a, replica_b, dead):
+        await engine.dispose()
+
+def test_wants_primary():
+    assert wants_primary({"x-read-consistency": "primary"}, {})
+    assert wants_primary({}, {STICKY_COOKIE: str(time.time() + 5)})
+    assert not wants_primary({}, {STICKY_COOKIE: str(time.time() - 5)})
+    assert not wants_primary({}, {STICKY_COOKIE: "garbage"})
@@ -0,0 +1,31 @@
+from datetime import datetime
+from types import SimpleNamespace
+from app.services.search import InMemorySearchBackend, highlight
+
+def _task(id, title, description=None, owner_id=1):
+    return SimpleNamespace(id=id, title=title, description=description, owner_id=owner_id,
+                           created_at=datetime(2025, 5, 7), priority=1)
+
+def test_memory_index_prefix_match_and_ranking():
+    backend = InMemorySearchBackend()
+    backend.index(_task(1, "Deploy release", "after review"))
+    backend.index(_task(2, "Write report", "deploy notes"))
+    backend.index(_task(3, "Deploy", owner_id=2))
+    scores = backend._match(1, ["depl"])
+    assert set(scores) == {1, 2}
+    assert scores[1] > scores[2]
+    assert backend._match(1, ["depl", "rev"]).keys() == {1}
+
+def test_memory_index_reindex_drops_old_terms():
+    backend = InMemorySearchBackend()
+    backend.index(_task(1, "Deploy release"))
+    backend.index(_task(1, "Fix bug"))
+    assert backend._match(1, ["deploy"]) == {}
+    assert backend._match(1, ["fix"]).keys() == {1}
+    backend.remove(1)
+    assert backend._vocab[1] == []
+
+def test_highlight_escapes_and_marks_prefixes():
+    assert highlight("<b>Deploy</b> deployment", ["depl"]) == "&lt;b&gt;<mark>Deploy</mark>&lt;/b&gt; <mark>deployment</mark>"
+    snippet = highlight("x" * 200 + " needle " + "y" * 200, ["needle"], radius=10)
+    assert snippet.startswith("…") and snippet.endswith("…") and "<mark>needle</mark>" in snippet
@@ -0,0 +1,25 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from app.schemas.task import TaskOut
+from app.services import serialization
+from app.services.serialization import iter_page, render_page, task_row
+
+def _task(id, **extra):
+    return SimpleNamespace(id=id, title=f"Task {id}", description=None, status="pending", priority=1,
+                           created_at=datetime(2025, 5, 7, 12, 0, 0, 1500), owner_id=1, version=1, **extra)
+
+def test_task_row_matches_task_out():
+    task = _task(1, search_vector="ignored")
+    assert json.loads(render_page([task_row(task)], None))["items"][0] == json.loads(TaskOut.model_validate(task, from_attributes=True).model_dump_json())
+
+def test_streamed_page_equals_rendered_page():
+    items = [task_row(_task(i)) for i in range(1, 8)]
+    assert b"".join(iter_page(items, "abc", chunk_size=3)) == render_page(items, "abc")
+    assert b"".join(iter_page([], None)) == render_page([], None)
+
+def test_stdlib_fallback(monkeypatch):
+    items = [task_row(_task(1))]
+    expected = json.loads(render_page(items, None))
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(render_page(items, None)) == expected
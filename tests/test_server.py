@@ -0,0 +1,26 @@
+import logging
+import pytest
+from app import config, server
+
+@pytest.fixture
+def uvicorn_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server, "load_dotenv", lambda: None)
+    monkeypatch.setattr(server.uvicorn, "run", lambda app, **options: calls.append(options))
+    # main() exports the worker count for the spawned workers
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    return calls
+
+def test_trusted_proxies_are_passed_to_uvicorn(uvicorn_calls, monkeypatch):
+    monkeypatch.setenv("FORWARDED_ALLOW_IPS", "10.0.0.5")
+    server.main(["--workers", "1"])
+    assert uvicorn_calls[0]["proxy_headers"] and uvicorn_calls[0]["forwarded_allow_ips"] == "10.0.0.5"
+    server.main(["--workers", "1", "--forwarded-allow-ips", "*"])
+    assert uvicorn_calls[1]["forwarded_allow_ips"] == "*"
+
+@pytest.mark.parametrize("budget, workers, warned", [(0, 1, False), (0, 4, True), (90, 4, False), (6, 4, True)])
+def test_connection_budget_warnings(uvicorn_calls, monkeypatch, caplog, budget, workers, warned):
+    monkeypatch.setattr(config, "DB_MAX_CONNECTIONS", budget)
+    with caplog.at_level(logging.WARNING, logger="app.server"):
+        server.main(["--workers", str(workers)])
+    assert any("DB_MAX_CONNECTIONS" in record.getMessage() for record in caplog.records) == warned
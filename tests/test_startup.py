@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", 1.0))
+
+# Runs in a fresh interpreter so module imports are part of the measurement
+COLD_START = """
+import json, time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.instrumentation import DB_QUERY_SECONDS
+with TestClient(app) as client:
+    response = client.get("/health")
+    elapsed = time.perf_counter() - start
+    queries = sum(sum(counts) for counts in DB_QUERY_SECONDS._counts.values())
+print(json.dumps({"status": response.status_code, "elapsed": elapsed, "queries": queries}))
+"""
+
+def _run(args, env):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+
+def test_cold_start_to_first_request_within_budget(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}", AUTO_MIGRATE="false")
+    _run(["-m", "app.migrations", "upgrade"], env)
+    result = json.loads(_run(["-c", COLD_START], env).stdout.strip().splitlines()[-1])
+    assert result["status"] == 200
+    assert result["queries"] == 1, "startup should only read schema_version"
+    assert result["elapsed"] < STARTUP_BUDGET_SECONDS, f"cold start took {result['elapsed']:.3f}s"
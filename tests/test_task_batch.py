@@ -0,0 +1,91 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select, text
+from app.models.task import Task
+from app.models.user import User
+from app.routes import task as task_routes
+from app.schemas.task import TaskDeleteOperation, TaskUpdate, TaskUpdateOperation
+from app.services.task_batch import execute_batch
+
+@pytest_asyncio.fixture(autouse=True)
+async def seed_tasks(session_factory):
+    async with session_factory() as db:
+        await db.execute(insert(Task), [
+            {"id": 1, "title": "mine", "priority": 1, "status": "pending", "owner_id": 1},
+            {"id": 2, "title": "mine too", "priority": 1, "status": "pending", "owner_id": 1},
+            {"id": 3, "title": "theirs", "priority": 1, "status": "pending", "owner_id": 2},
+        ])
+        await db.commit()
+
+async def _tasks_version(session_factory, user_id=1):
+    async with session_factory() as db:
+        return await db.scalar(select(User.tasks_version).filter(User.id == user_id))
+
+@pytest.mark.asyncio
+async def test_mixed_batch_reports_every_operation(task_client, session_factory):
+    response = await task_client.post("/tasks/batch", json=[
+        {"op": "create", "task": {"title": "new", "priority": 2}},
+        {"op": "update", "id": 1, "task": {"status": "done"}},
+        {"op": "delete", "id": 2},
+        {"op": "update", "id": 3, "task": {"status": "done"}},
+        {"op": "delete", "id": 99},
+    ])
+    assert response.status_code == 200
+    results = response.json()
+    assert [(result["op"], result["status"]) for result in results] == [
+        ("create", 200), ("update", 200), ("delete", 200), ("update", 404), ("delete", 404),
+    ]
+    assert results[0]["task"]["title"] == "new" and results[0]["task"]["version"] == 1
+    assert results[1]["task"]["status"] == "done" and results[1]["task"]["version"] == 2
+    async with session_factory() as db:
+        rows = {row.id: (row.status, row.version) for row in await db.execute(select(Task.id, Task.status, Task.version))}
+    assert rows[1] == ("done", 2) and 2 not in rows and rows[3] == ("pending", 1)
+    assert await _tasks_version(session_factory) == 1
+    assert await _tasks_version(session_factory, 2) == 0
+
+@pytest.mark.asyncio
+async def test_batch_of_only_missing_tasks_does_not_bump_the_version(task_client, session_factory):
+    response = await task_client.post("/tasks/batch", json=[{"op": "delete", "id": 3}])
+    assert response.json()[0]["status"] == 404
+    assert await _tasks_version(session_factory) == 0
+
+@pytest.mark.asyncio
+async def test_batch_limit_and_duplicate_ids_are_rejected(task_client, monkeypatch):
+    monkeypatch.setattr(task_routes, "TASKS_BATCH_MAX", 2)
+    too_many = [{"op": "create", "task": {"title": "t", "priority": 1}}] * 3
+    assert (await task_client.post("/tasks/batch", json=too_many)).status_code == 422
+    duplicate = [{"op": "update", "id": 1, "task": {"priority": 5}}, {"op": "delete", "id": 1}]
+    assert (await task_client.post("/tasks/batch", json=duplicate)).status_code == 422
+
+class ConcurrentDelete:
+    """Session wrapper that deletes task 1 right before the batch's first UPDATE or DELETE,
+    after the ownership check, as a concurrent request would."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def _interfere(self, statement):
+        if getattr(statement, "is_dml", False) and (statement.is_update or statement.is_delete):
+            await self.db.execute(text("DELETE FROM tasks WHERE id = 1"))
+
+    async def execute(self, statement, *args, **kwargs):
+        await self._interfere(statement)
+        return await self.db.execute(statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        await self._interfere(statement)
+        return await self.db.scalars(statement, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("operation", [
+    TaskUpdateOperation(op="update", id=1, task=TaskUpdate(priority=5)),
+    TaskDeleteOperation(op="delete", id=1),
+])
+async def test_task_deleted_during_the_batch_is_reported_missing(session_factory, operation):
+    async with session_factory() as db:
+        results = await execute_batch(ConcurrentDelete(db), 1, [operation])
+    assert results == [{"index": 0, "op": operation.op, "status": 404, "detail": "Task not found"}]
+    assert await _tasks_version(session_factory) == 0
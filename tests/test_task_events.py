@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.services.task_events import HEARTBEAT, TaskEventHub, changes_frame, resync_frame
+
+def _task(id, version=1):
+    return SimpleNamespace(id=id, title="t", description=None, status="open", priority=1, owner_id=1,
+                           created_at=None, version=version)
+
+async def _take(stream, count):
+    return [await asyncio.wait_for(stream.__anext__(), 1) for _ in range(count)]
+
+@pytest.mark.asyncio
+async def test_stream_sends_ready_then_only_newer_events():
+    hub = TaskEventHub(heartbeat=0.05)
+    subscription = hub.subscribe(1)
+    hub.publish(1, 3, changes_frame(3, [_task(1)]))
+    hub.publish(1, 4, changes_frame(4, [_task(1, version=2)]))
+    hub.publish(2, 1, changes_frame(1, [_task(9)]))
+    stream = hub.stream(subscription, None, 3)
+    ready, event, heartbeat = await _take(stream, 3)
+    assert ready.startswith(b"id: 3\nevent: ready\n")
+    assert event.startswith(b"id: 4\nevent: tasks\n") and b'"version":2' in event
+    assert heartbeat == HEARTBEAT
+    await stream.aclose()
+    assert hub.subscriber_count() == 0
+
+@pytest.mark.asyncio
+async def test_resume_replays_history_or_asks_for_resync():
+    hub = TaskEventHub()
+    for version in (5, 6, 7):
+        hub.publish(1, version, changes_frame(version, [_task(version)]))
+    stream = hub.stream(hub.subscribe(1), 5, 7)
+    assert [frame.split(b"\n")[0] for frame in await _take(stream, 2)] == [b"id: 6", b"id: 7"]
+    await stream.aclose()
+    stream = hub.stream(hub.subscribe(1), 2, 7)
+    assert await _take(stream, 1) == [resync_frame(7)]
+    await stream.aclose()
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync_instead_of_growing_queue():
+    hub = TaskEventHub(queue_size=2)
+    subscription = hub.subscribe(1)
+    for version in (1, 2, 3):
+        hub.publish(1, version, changes_frame(version, [_task(version)]))
+    assert subscription.queue.qsize() == 1
+    assert subscription.queue.get_nowait() == (3, resync_frame(3))
+
+@pytest.mark.asyncio
+async def test_remote_reset_resyncs_without_moving_the_event_id():
+    hub = TaskEventHub()
+    subscription = hub.subscribe(1)
+    hub.on_remote_change(None)
+    version, frame = subscription.queue.get_nowait()
+    assert version is None and frame.startswith(b"event: resync\n")
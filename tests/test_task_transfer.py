@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from app.models.task import Task
+from app.services.archive import archive_tasks
+from app.services.task_transfer import _CsvRecords, export_tasks, iter_lines
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+async def _lines(*parts, max_line=16):
+    return [item async for item in iter_lines(_chunks(*parts), max_line=max_line)]
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_chunks_and_numbers_lines():
+    assert await _lines(b"ab", b"c\r\nd", b"\n\ne") == [(1, b"abc"), (2, b"d"), (3, b""), (4, b"e")]
+
+@pytest.mark.asyncio
+async def test_iter_lines_drops_oversized_lines_without_buffering_them():
+    lines = await _lines(b"x" * 10, b"x" * 10, b"x" * 10, b"\nok\n", max_line=16)
+    assert lines == [(1, None), (2, b"ok")]
+
+@pytest.mark.asyncio
+async def test_iter_lines_splits_many_lines_per_chunk_like_byte_chunks():
+    body = b"".join(b"line %d\r\n" % index for index in range(50)) + b"x" * 40 + b"\ntail"
+    whole = await _lines(body, max_line=16)
+    assert whole == await _lines(*(body[index:index + 1] for index in range(len(body))), max_line=16)
+    assert whole[0] == (1, b"line 0") and whole[-2:] == [(51, None), (52, b"tail")]
+
+def test_csv_records_join_quoted_newlines_and_skip_empty_cells():
+    records = _CsvRecords()
+    rows = []
+    for number, line in enumerate(['title,description,priority', '"two', 'lines",,1', 'a,b'], start=1):
+        rows.extend(records.feed(number, line))
+    assert rows == [(2, {"title": "two\nlines", "priority": "1"}), (4, None)]
+    assert records.unterminated() is None
+    list(records.feed(5, '"open'))
+    assert records.unterminated() == 5
+
+@pytest.mark.asyncio
+async def test_export_includes_archived_tasks(session_factory):
+    async with session_factory() as db:
+        await db.execute(insert(Task), [
+            {"id": i, "title": f"t{i}", "owner_id": 1, "status": "done", "priority": 1, "created_at": datetime(2024, 1, i)}
+            for i in range(1, 6)
+        ])
+        await db.commit()
+    await archive_tasks(timedelta(days=1), "done", batch_size=2, now=datetime(2024, 1, 4), session_factory=session_factory)
+
+    async def exported(**options):
+        body = b"".join([chunk async for chunk in export_tasks(1, "ndjson", session_factory=session_factory, **options)])
+        return [json.loads(line)["id"] for line in body.splitlines()]
+
+    assert await exported() == [1, 2, 3, 4, 5]
+    assert await exported(include_archived=False) == [3, 4, 5]
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from sqlalchemy import select
+from app.models.task import Task
+from app.models.user import User
+from app.services import write_coalescer
+from app.services.write_coalescer import COALESCE_FALLBACKS, TaskCreateCoalescer
+
+async def _versions(session_factory):
+    async with session_factory() as db:
+        return dict((await db.execute(select(User.id, User.tasks_version))).all())
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_share_one_commit(session_factory):
+    coalescer = TaskCreateCoalescer(window_ms=20, max_rows=100, session_factory=session_factory)
+    tasks = await asyncio.gather(*(coalescer.create(1 + index % 2, {"title": f"t{index}", "priority": 1}) for index in range(10)))
+    assert [task.title for task in tasks] == [f"t{index}" for index in range(10)]
+    assert [task.owner_id for task in tasks] == [1 + index % 2 for index in range(10)]
+    assert len({task.id for task in tasks}) == 10
+    assert await _versions(session_factory) == {1: 1, 2: 1}
+
+@pytest.mark.asyncio
+async def test_row_cap_flushes_without_waiting_for_the_window(session_factory):
+    coalescer = TaskCreateCoalescer(window_ms=10_000, max_rows=3, session_factory=session_factory)
+    tasks = await asyncio.wait_for(asyncio.gather(*(coalescer.create(1, {"title": "t", "priority": 1}) for _ in range(3))), 5)
+    assert len(tasks) == 3
+
+@pytest.mark.asyncio
+async def test_failing_row_is_isolated(session_factory):
+    coalescer = TaskCreateCoalescer(window_ms=20, max_rows=100, session_factory=session_factory)
+    fallbacks = COALESCE_FALLBACKS.value()
+    results = await asyncio.gather(
+        coalescer.create(1, {"title": "ok", "priority": 1}),
+        coalescer.create(1, {"title": object(), "priority": 1}),
+        coalescer.create(2, {"title": "ok", "priority": 1}),
+        return_exceptions=True,
+    )
+    assert results[0].title == "ok" and results[2].owner_id == 2
+    assert isinstance(results[1], Exception)
+    assert COALESCE_FALLBACKS.value() == fallbacks + 1
+    assert await _versions(session_factory) == {1: 1, 2: 1}
+
+@pytest.mark.asyncio
+async def test_delivery_error_after_commit_does_not_rewrite_rows(session_factory, monkeypatch):
+    class BrokenIndex:
+        def index(self, task):
+            raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(write_coalescer, "search_backend", BrokenIndex())
+    coalescer = TaskCreateCoalescer(window_ms=20, max_rows=100, session_factory=session_factory)
+    fallbacks = COALESCE_FALLBACKS.value()
+    results = await asyncio.gather(*(coalescer.create(1, {"title": "t", "priority": 1}) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert COALESCE_FALLBACKS.value() == fallbacks
+    async with session_factory() as db:
+        assert len((await db.scalars(select(Task.id))).all()) == 3